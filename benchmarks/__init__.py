@@ -0,0 +1,6 @@
+"""
+Benchmarks of the library's notification and collection hot paths.
+
+Run with `python -m benchmarks --framework pyside6` (Qt runs headless on the offscreen platform) or
+`--framework python` for the pure python backend. See `python -m benchmarks --help`.
+"""
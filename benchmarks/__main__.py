@@ -0,0 +1,200 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchmarks
+import mvvm
+
+# Baselines are specific to the machine, they're kept out of version control
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Slowdowns smaller than this many seconds per timed run are taken for timer and scheduling noise
+NOISE_SECONDS = 0.001
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=benchmarks.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--framework", default="python", choices=mvvm.FRAMEWORKS)
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--max-size", type=int, default=None, help="Skip sizes above this, e.g. 100000")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per benchmark, the fastest is kept")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", nargs="?", const="", default=None,
+                        help="Compare against a baseline JSON file, by default the framework's stored baseline. "
+                             "Exits with 1 if any benchmark regressed beyond its threshold")
+    parser.add_argument("--confirm", type=int, default=3,
+                        help="Fresh processes measuring a benchmark slower than its baseline again before it "
+                             "counts as regressed, the fastest measurement is kept")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the framework's baseline")
+    parser.add_argument("--processes", type=int, default=3,
+                        help="Processes measuring a baseline, the slowest result of each benchmark is stored so "
+                             "that comparisons allow for the noise between processes")
+    # Benchmarks measured by a process started to measure them again, e.g. "collection.append[1000]"
+    parser.add_argument("--only", action="append", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def baseline_path(framework):
+    return os.path.join(BASELINE_DIR, f"{framework}.json")
+
+
+def benchmark_key(case, size):
+    return case.name if size is None else f"{case.name}[{size}]"
+
+
+def measure(case, size, repeat):
+    best = None
+    ops = 1
+    # Large sizes are slow to set up and stable enough with fewer runs
+    for _ in range(repeat if not size or size < 1_000_000 else min(repeat, 2)):
+        run, ops = case.func(size)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best, "ops": ops, "per_op": best / ops}
+
+
+def run_benchmarks(args, qt):
+    from benchmarks.cases import cases
+
+    results = {}
+    for case in cases.values():
+        if case.qt_only and not qt or args.filter not in case.name:
+            continue
+        for size in case.sizes:
+            if size and args.max_size and size > args.max_size:
+                continue
+            key = benchmark_key(case, size)
+            if args.only and key not in args.only:
+                continue
+            results[key] = measure(case, size, args.repeat)
+            print(f"{key:40} {results[key]['per_op'] * 1e6:12.3f} us/op", flush=True)
+    return results
+
+
+def run_in_process(args, keys=None):
+    """
+    Results of the benchmarks selected, only those named by keys if given, measured by a fresh interpreter.
+    Timings vary more between processes than within one (memory layout, hash seeds), so repeating a
+    measurement in the same process can't tell noise from a regression.
+    """
+    command = [sys.executable, "-m", "benchmarks", "--framework", args.framework, "--filter", args.filter,
+               "--repeat", str(args.repeat)]
+    if args.max_size:
+        command += ["--max-size", str(args.max_size)]
+    for key in keys or ():
+        command += ["--only", key]
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.json")
+        subprocess.run(command + ["--output", output], check=True, stdout=subprocess.DEVNULL)
+        with open(output) as f:
+            return json.load(f)["results"]
+
+
+def slowest_results(runs):
+    results = {}
+    for key in runs[0]:
+        measured = [run[key] for run in runs if key in run]
+        slowest = max(measured, key=lambda result: result["per_op"])
+        fastest = min(result["per_op"] for result in measured)
+        results[key] = dict(slowest, spread=slowest["per_op"] / fastest)
+    return results
+
+
+def slower(result, previous, threshold):
+    # Beyond the threshold and by more than noise
+    return result["per_op"] > previous["per_op"] * (1 + threshold) and \
+        (result["per_op"] - previous["per_op"]) * result["ops"] > NOISE_SECONDS
+
+
+def compare(results, baseline, args):
+    """
+    Benchmarks regressed since the baseline. Those slower than their threshold are measured again in up to
+    args.confirm fresh processes, keeping the fastest result, so that noise alone doesn't fail the comparison.
+    """
+    from benchmarks.cases import cases
+
+    if baseline.get("platform") != platform.platform() or baseline.get("python") != platform.python_version():
+        print(f"\nWarning: the baseline was measured with python {baseline.get('python')} on "
+              f"{baseline.get('platform')}, save one on this machine with --save-baseline")
+
+    def threshold(key):
+        return cases[key.split("[")[0]].threshold
+
+    def regressed_keys():
+        return [key for key, result in results.items()
+                if key in baseline["results"] and slower(result, baseline["results"][key], threshold(key))]
+
+    regressed = regressed_keys()
+    for _ in range(args.confirm):
+        if not regressed:
+            break
+        for key, again in run_in_process(args, regressed).items():
+            if again["per_op"] < results[key]["per_op"]:
+                results[key] = again
+        regressed = regressed_keys()
+
+    print(f"\n{'benchmark':40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for key, result in results.items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = result["per_op"] / previous["per_op"]
+        status = f"  REGRESSED (threshold {threshold(key):.0%})" if key in regressed else ""
+        print(f"{key:40} {previous['per_op'] * 1e6:10.3f}us {result['per_op'] * 1e6:10.3f}us {ratio:7.2f}{status}")
+    return regressed
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if args.compare is not None:
+        path = args.compare or baseline_path(args.framework)
+        if not os.path.exists(path):
+            sys.exit(f"No baseline at {path}, measure one on this machine with --save-baseline first")
+        with open(path) as f:
+            baseline = json.load(f)
+    qt = args.framework != "python"
+    if qt:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    mvvm.use(args.framework)
+    if qt:
+        from mvvm._qt_common import QtCore
+        app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv[:1])  # noqa: F841
+
+    report = {
+        "framework": args.framework,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run_benchmarks(args, qt),
+    }
+
+    if args.save_baseline:
+        runs = [report["results"]] + [run_in_process(args) for _ in range(args.processes - 1)]
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.framework), "w") as f:
+            json.dump(dict(report, results=slowest_results(runs)), f, indent=2)
+    # Compared before writing the output, which then has the results measured again
+    regressed = compare(report["results"], baseline, args) if baseline is not None else []
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import random
+
+from mvvm import ModelBase, Property, ObservableCollection
+
+# Benchmark name -> Case, filled by @benchmark in definition order
+cases = {}
+
+SIZES = (1_000, 100_000, 1_000_000)
+
+
+class Case:
+    def __init__(self, name, func, sizes, threshold, qt_only):
+        self.name = name
+        self.func = func
+        self.sizes = sizes
+        self.threshold = threshold
+        self.qt_only = qt_only
+
+
+def benchmark(name, sizes=(None,), threshold=0.25, qt_only=False):
+    """
+    Registers func(size) as a benchmark. It does the untimed setup and returns (run, ops): run() is timed and
+    performs ops operations. threshold is the slowdown relative to the baseline above which it regresses.
+    """
+    def decorate(func):
+        cases[name] = Case(name, func, sizes, threshold, qt_only)
+        return func
+    return decorate
+
+
+class Item(ModelBase):
+    value = Property(int, field="_value")
+
+    def __init__(self, value=0):
+        super().__init__()
+        self._value = value
+
+
+class Relay(ModelBase):
+    def __init__(self, source):
+        super().__init__()
+        self._source = source
+        self._propagate_property_changed(source, "value")
+
+    @Property(int)
+    def value(self):
+        return self._source.value
+
+
+@benchmark("property.set_notify", threshold=0.3)
+def property_set_notify(size):
+    item = Item()
+    item.on_property_changed("value").connect(lambda: None)
+    count = 20_000
+
+    def run():
+        for i in range(count):
+            item.value = i
+    return run, count
+
+
+@benchmark("property.set_unchanged", threshold=0.3)
+def property_set_unchanged(size):
+    item = Item(1)
+    item.on_property_changed("value").connect(lambda: None)
+    count = 20_000
+
+    def run():
+        for _ in range(count):
+            item.value = 1
+    return run, count
+
+
+@benchmark("propagate.chain_10", threshold=0.3)
+def propagate_chain(size):
+    root = last = Item()
+    relays = []
+    for _ in range(10):
+        last = Relay(last)
+        relays.append(last)
+    last.on_property_changed("value").connect(lambda: None)
+    count = 2_000
+
+    def run():
+        for i in range(count):
+            root.value = i
+    run.keep_alive = relays
+    return run, count
+
+
+@benchmark("propagate.fan_out_100", threshold=0.3)
+def propagate_fan_out(size):
+    root = Item()
+    relays = [Relay(root) for _ in range(100)]
+    count = 200
+
+    def run():
+        for i in range(count):
+            root.value = i
+    run.keep_alive = relays
+    return run, count
+
+
+@benchmark("collection.append", sizes=SIZES)
+def collection_append(size):
+    collection = ObservableCollection()
+    items = list(range(size))
+
+    def run():
+        for item in items:
+            collection.append(item)
+    return run, size
+
+
+@benchmark("collection.extend", sizes=SIZES)
+def collection_extend(size):
+    collection = ObservableCollection()
+    items = list(range(size))
+
+    def run():
+        collection.extend(items)
+    return run, 1
+
+
+@benchmark("collection.remove", sizes=SIZES)
+def collection_remove(size):
+    collection = ObservableCollection(list(range(size)))
+    count = min(100, size)
+    targets = [size // 2 + i for i in range(count)]
+
+    def run():
+        for item in targets:
+            collection.remove(item)
+    return run, count
+
+
+@benchmark("collection.filter_remove", sizes=SIZES)
+def collection_filter_remove(size):
+    collection = ObservableCollection(list(range(size)))
+
+    def run():
+        collection.filter_remove(lambda item: item % 10 == 0)
+    return run, 1
+
+
+@benchmark("collection.replace", sizes=SIZES)
+def collection_replace(size):
+    collection = ObservableCollection(list(range(size)))
+    rng = random.Random(size)
+    count = 1_000
+    rows = [rng.randrange(size) for _ in range(count)]
+
+    def run():
+        for row in rows:
+            collection.replace(row, -row)
+    return run, count
+
+
+@benchmark("model.data", sizes=SIZES[:2], qt_only=True)
+def model_data(size):
+    collection = ObservableCollection(list(range(size)))
+    role = collection._MODELDATA_ROLE
+    count = 10_000
+    indexes = [collection.index(i * size // count, 0) for i in range(count)]
+    data = collection.data
+
+    def run():
+        for index in indexes:
+            data(index, role)
+    return run, count
+
+
+@benchmark("model.row_count", sizes=SIZES[:2], qt_only=True)
+def model_row_count(size):
+    collection = ObservableCollection(list(range(size)))
+    count = 10_000
+    row_count = collection.rowCount
+
+    def run():
+        for _ in range(count):
+            row_count()
+    return run, count
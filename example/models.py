@@ -12,31 +12,10 @@ class TodoItem(ModelBase):
     def __repr__(self):
         return f"TodoItem(is_complete={self._is_complete}, text={self._text})"
 
-    @Property(uuid.UUID)
-    def id(self):
-        return self._id
-
-    @Property(str)
-    def text(self):
-        return self._text
-
-    @text.setter
-    def text(self, value):
-        if self._text == value:
-            return
-        self._text = value
-        self._notify_property_changed()
-
-    @Property(bool)
-    def is_complete(self):
-        return self._is_complete
-
-    @is_complete.setter
-    def is_complete(self, value):
-        if self._is_complete == value:
-            return
-        self._is_complete = value
-        self._notify_property_changed()
+    # Properties with a backing field get a generated getter and a setter that notifies on change
+    id = Property(uuid.UUID, field="_id", constant=True)
+    text = Property(str, field="_text")
+    is_complete = Property(bool, field="_is_complete")
 
 
 class TodoList(ModelBase):
@@ -47,9 +26,8 @@ class TodoList(ModelBase):
         super().__init__()
         self._items = items or []
 
-    @property
-    def items(self):
-        return self._items
+    # Stored by mvvm.dump(), so a session can be saved with mvvm.dump(todo_list, fp) and restored with mvvm.load(fp)
+    items = Property(list, field="_items", constant=True)
 
     def add_todo_item(self, text):
         item = TodoItem(text)
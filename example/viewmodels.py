@@ -1,7 +1,7 @@
 import uuid
 from typing import List
 
-from mvvm import ModelBase, ViewModelBase, Property, Event, ObservableCollection, Command
+from mvvm import ModelBase, ViewModelBase, Property, Event, KeyedObservableCollection, Command
 from example.models import TodoList, TodoItem
 
 
@@ -36,54 +36,23 @@ class TodoListViewModel(ViewModelBase):
         super().__init__()
         self._text_entry = ""
         self._todo_list = todo_list
-        self._todo_list.todo_item_added.connect(self._item_added)
-        self._todo_list.items_removed.connect(self._items_removed)
-        self._todo_items = ObservableCollection()
-        self._completed_items = ObservableCollection()
+        # Bindings only hold this viewmodel weakly and are disconnected when it is disposed
+        self.bind(self._todo_list, "todo_item_added", self._item_added)
+        self.bind(self._todo_list, "items_removed", self._items_removed)
+        # Keyed by ID so lookups and removals don't have to scan the list,
+        # removed item viewmodels are disposed so they stop listening to their items
+        self._items = KeyedObservableCollection(key=lambda vm: vm.id, dispose_removed=True)
+        # Live views of the items which update themselves whenever an item's is_complete changes
+        self._todo_items = self._items.view(where=lambda vm: not vm.is_complete, depends_on=["is_complete"])
+        self._completed_items = self._items.view(where=lambda vm: vm.is_complete, depends_on=["is_complete"])
 
     def _item_added(self, item: TodoItem):
-        item_viewmodel = TodoItemViewModel(item)
-
-        if item.is_complete:
-            self._completed_items.append(item_viewmodel)
-        else:
-            self._todo_items.append(item_viewmodel)
-
-        # Register for whenever the item is completed to move it to the corresponding list
-        def on_completed():
-            if item_viewmodel.is_complete:
-                if item_viewmodel in self._todo_items:
-                    self._todo_items.remove(item_viewmodel)
-                self._completed_items.append(item_viewmodel)
-            else:
-                if item_viewmodel in self._completed_items:
-                    self._completed_items.remove(item_viewmodel)
-                self._todo_items.append(item_viewmodel)
-        item_viewmodel.on_property_changed("is_complete").connect(on_completed)
+        self._items.append(TodoItemViewModel(item))
 
     def _items_removed(self, items: List[TodoItem]):
-        # Sort the IDs for the correct list
-        todo_ids = []
-        completed_ids = []
-        for item in items:
-            lst = completed_ids if item.is_complete else todo_ids
-            lst.append(item.id)
-
-        if todo_ids:
-            self._todo_items.filter_remove(lambda item: item.id in todo_ids)
-        if completed_ids:
-            self._completed_items.filter_remove(lambda item: item.id in completed_ids)
+        self._items.remove_keys(item.id for item in items)
 
-    @Property(str)
-    def text_entry(self):
-        return self._text_entry
-
-    @text_entry.setter
-    def text_entry(self, value):
-        if self._text_entry == value:
-            return
-        self._text_entry = value
-        self._notify_property_changed()
+    text_entry = Property(str, field="_text_entry")
 
     @Property(ModelBase)  # TODO: Why doesn't ObservableCollection work here for pyside6??
     def todo_items(self):
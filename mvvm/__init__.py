@@ -1,23 +1,55 @@
 import importlib
+import time
 from . import _doc
 
 
 Command = _doc.Command
 Event = _doc.Event
 ObservableCollection = _doc.ObservableCollection
+KeyedObservableCollection = _doc.KeyedObservableCollection
+ObservableCollectionView = _doc.ObservableCollectionView
+LazyObservableCollection = _doc.LazyObservableCollection
+ColumnarObservableCollection = _doc.ColumnarObservableCollection
+RingObservableCollection = _doc.RingObservableCollection
+ObservableTable = _doc.ObservableTable
 Property = _doc.Property
 ModelBase = _doc.ModelBase
 ViewModelBase = _doc.ViewModelBase
+process_events = _doc.process_events
+register_pending_types = _doc.register_pending_types
+
+# Names imported on first access, so importing mvvm stays cheap until they're needed
+_lazy_names = {
+    "set_executor": "_common",
+    "PropertyInfo": "_common",
+    "Instrumentation": "_instrument",
+    "ChangeJournal": "_journal",
+    "dump": "_serialize",
+    "dumps": "_serialize",
+    "load": "_serialize",
+    "loads": "_serialize",
+}
+
+
+def __getattr__(name):
+    module = _lazy_names.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
 
 
 FRAMEWORKS = [
     "pyside2",
     "pyside6",
     "pyqt5",
-    "pyqt6"
+    "pyqt6",
+    "python"
 ]
 
 current_framework = None
+_backend = None
 
 
 def pyside2():
@@ -36,6 +68,10 @@ def pyqt6():
     use("pyqt6")
 
 
+def python():
+    use("python")
+
+
 def use(framework: str):
     global current_framework
     framework = framework.lower().strip()
@@ -50,15 +86,54 @@ def use(framework: str):
                          f"Supported backends: {', '.join(FRAMEWORKS)}")
 
     current_framework = framework
+    start = time.perf_counter()
     module = importlib.import_module(f"._{framework}", __name__)
     _use(module)
+    from ._common import startup_timings
+    startup_timings.framework = framework
+    startup_timings.use = time.perf_counter() - start
 
 
 def _use(module):
-    global Command, Event, ObservableCollection, Property, ModelBase, ViewModelBase
+    global _backend
+    global Command, Event, ObservableCollection, KeyedObservableCollection, ObservableCollectionView
+    global LazyObservableCollection, ColumnarObservableCollection, RingObservableCollection, ObservableTable
+    global Property, ModelBase, ViewModelBase, process_events, register_pending_types
+    _backend = module
     Command = module.Command
     Event = module.Event
     ObservableCollection = module.ObservableCollection
+    KeyedObservableCollection = module.KeyedObservableCollection
+    ObservableCollectionView = module.ObservableCollectionView
+    LazyObservableCollection = module.LazyObservableCollection
+    ColumnarObservableCollection = module.ColumnarObservableCollection
+    RingObservableCollection = module.RingObservableCollection
+    ObservableTable = module.ObservableTable
     Property = module.Property
     ModelBase = module.ModelBase
     ViewModelBase = module.ViewModelBase
+    process_events = module.process_events
+    register_pending_types = module.register_pending_types
+
+
+def startup_report() -> dict:
+    """
+    Time spent starting up, in seconds: in use() (importing the backend), creating each model class, and
+    registering types with QML. Registration happens once a model is created or on register_pending_types().
+    """
+    from ._common import startup_timings
+    return startup_timings.report()
+
+
+def instrument(storm_threshold: int = 100, on_storm=None) -> "Instrumentation":
+    """
+    Starts collecting per-class and per-property notification counts, listener counts and handler times,
+    Command and collection mutation statistics until stop() is called on the returned Instrumentation, or
+    its with block exits. Properties notifying more than storm_threshold times in one event loop tick are
+    counted as storms and reported to on_storm(class_name, property_name, emits).
+    Nothing is wrapped, and so nothing measured or slowed down, while not instrumenting.
+    """
+    if _backend is None:
+        raise RuntimeError("Choose an MVVM framework with mvvm.use() before instrumenting")
+    from ._instrument import Instrumentation
+    return Instrumentation(_backend, storm_threshold, on_storm).start()
@@ -0,0 +1,2681 @@
+from __future__ import annotations
+import array
+import atexit
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import importlib
+import inspect
+import itertools
+import math
+import sys
+import threading
+import time
+import types
+import weakref
+from typing import Any, Callable, NamedTuple, Optional
+
+# Backend-independent parts of the library, shared by the Qt and pure python backends
+
+DISPLAY_ROLE = 0
+MODEL_DATA_ROLE = 0x0100 + 1  # Qt.UserRole + 1
+
+
+def _index_runs(indices):
+    # Groups ascending indices into [start, stop) runs of consecutive indices
+    runs = []
+    for i in indices:
+        if runs and runs[-1][1] == i:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+    return runs
+
+
+def _without_runs(values, runs):
+    # values without the [start, stop) runs, ascending and apart, in one pass
+    kept = []
+    start = 0
+    for run_start, run_stop in runs:
+        kept.extend(values[start:run_start])
+        start = run_stop
+    kept.extend(values[start:])
+    return kept
+
+
+class _Compaction:
+    """
+    A list losing ascending [start, stop) runs front to back in one pass: each step() moves the rows up to the
+    next run down over the rows removed, finish() drops the gap left and returns the list. Until then it reads
+    as the list with the runs stepped over so far removed.
+    """
+    __slots__ = ("_values", "_runs", "_done", "_kept", "_next")
+
+    def __init__(self, values, runs):
+        self._values = values
+        self._runs = runs
+        self._done = 0
+        self._kept = 0  # values[:_kept] are the rows kept so far
+        self._next = 0  # values[_next:] are as they were, the rows between are a gap
+
+    @property
+    def next_run(self):
+        """The [start, stop) rows the next run is at now"""
+        start, stop = self._runs[self._done]
+        shift = self._next - self._kept
+        return start - shift, stop - shift
+
+    def step(self):
+        start, stop = self._runs[self._done]
+        if self._kept != self._next:
+            self._values[self._kept:self._kept + start - self._next] = self._values[self._next:start]
+        self._kept += start - self._next
+        self._next = stop
+        self._done += 1
+
+    def finish(self):
+        del self._values[self._kept:self._next]
+        return self._values
+
+    def __len__(self):
+        return len(self._values) - self._next + self._kept
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self._values[index if index < self._kept else index - self._kept + self._next]
+
+    def __iter__(self):
+        return itertools.chain(self._values[:self._kept], self._values[self._next:])
+
+    def index(self, value):
+        for i, v in enumerate(self):
+            if v is value or v == value:
+                return i
+        raise ValueError(f"{value!r} is not in list")
+
+
+def _longest_increasing_subsequence(values):
+    # Returns the positions in values of one longest strictly increasing subsequence
+    tails = []  # tails[n] is the position ending the smallest-valued increasing subsequence of length n+1
+    tail_values = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        n = bisect.bisect_left(tail_values, value)
+        if n:
+            previous[i] = tails[n - 1]
+        if n == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[n] = i
+            tail_values[n] = value
+
+    result = []
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+class _SlotCounter:
+    """Fenwick tree counting the occupied slots before a slot, both in O(log n)"""
+    def __init__(self, occupied):
+        tree = self._tree = [0] + [1 if slot else 0 for slot in occupied]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+
+    def add(self, slot, delta):
+        tree = self._tree
+        i = slot + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def before(self, slot):
+        tree = self._tree
+        total = 0
+        while slot > 0:
+            total += tree[slot]
+            slot -= slot & -slot
+        return total
+
+
+def _identity(item):
+    return item
+
+
+def _destroyed_signal(obj):
+    # Signal emitted when obj is destroyed, for backends where objects can go away while still referenced
+    destroyed_signal = getattr(obj, "_destroyed_signal", None)
+    return destroyed_signal() if destroyed_signal is not None else None
+
+
+class _Binding:
+    """A connection of a source's signal to callback(target, *args) which only holds the target weakly"""
+    __slots__ = ("_registry", "_signal", "_callback", "_destroyed", "_on_destroyed", "_target_is_source", "__weakref__")
+
+    def __init__(self, registry, source, signal, callback):
+        self._registry = registry
+        self._target_is_source = source is registry.target()
+        self._signal = signal
+        self._callback = callback
+        self._destroyed = _destroyed_signal(source)
+        self._on_destroyed = self._source_destroyed
+        signal.connect(self)
+        if self._destroyed is not None:
+            self._destroyed.connect(self._on_destroyed)
+
+    def __call__(self, *args):
+        target = self._registry.target()
+        if target is None:
+            self.dispose()
+        else:
+            self._callback(target, *args)
+
+    def _source_destroyed(self, *args):
+        # The source's connections are gone with it, its signals mustn't be touched anymore
+        self._signal = self._destroyed = None
+        self._registry._bindings.discard(self)
+
+    def dispose(self):
+        if self._signal is None:
+            return
+        self._signal.disconnect(self)
+        if self._destroyed is not None:
+            self._destroyed.disconnect(self._on_destroyed)
+        self._signal = self._destroyed = None
+        self._registry._bindings.discard(self)
+
+
+class BindingRegistry:
+    """
+    The connections the library made on behalf of one target object. Their callbacks only hold the target
+    weakly, and they are disconnected when either side is destroyed or on dispose().
+    """
+    def __init__(self, target):
+        self.target = weakref.ref(target)
+        self._bindings = set()
+        self._dispose_callbacks = []
+        # Collection of the target comes before its destroyed signal, when its own signals are already unusable
+        weakref.finalize(target, self._target_destroyed)
+        destroyed = _destroyed_signal(target)
+        if destroyed is not None:
+            destroyed.connect(self._target_destroyed)
+
+    def __len__(self):
+        return len(self._bindings)
+
+    def bind(self, source, signal, callback):
+        """Connects signal, belonging to source, to callback(target, *args)"""
+        binding = _Binding(self, source, signal, callback)
+        self._bindings.add(binding)
+        return binding
+
+    def on_dispose(self, callback):
+        """Calls callback() on every dispose(), to tear down state the bindings kept up to date"""
+        self._dispose_callbacks.append(callback)
+
+    def _target_destroyed(self, *args):
+        for binding in tuple(self._bindings):
+            if binding._target_is_source:
+                binding._source_destroyed()
+        self.dispose()
+
+    def dispose(self):
+        for binding in tuple(self._bindings):
+            binding.dispose()
+        for callback in tuple(self._dispose_callbacks):
+            callback()
+
+
+def bindings(obj) -> BindingRegistry:
+    """The BindingRegistry of obj"""
+    registry = obj.__dict__.get("_mvvm_bindings")
+    if registry is None:
+        registry = obj.__dict__["_mvvm_bindings"] = BindingRegistry(obj)
+    return registry
+
+
+class ListModelMixin:
+    """
+    Sequence of items exposed as a list model, shared by collections and their views.
+    Backends provide the row change contexts, _emit_data_changed() and _call_soon().
+    """
+    _role_getters = {MODEL_DATA_ROLE: _identity, DISPLAY_ROLE: _identity}  # Role -> getter(item)
+    _item_type = None
+
+    def __init__(self):
+        super().__init__()
+        self._items = []
+
+    def __getitem__(self, item):
+        return self._items[item]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def items(self):
+        return self._items
+
+    def _use_item_roles(self, item_type):
+        # Exposes each Property of item_type as its own role alongside modelData
+        self._item_type = item_type
+        self._role_getters = dict(ListModelMixin._role_getters)
+        self._role_getters.update((info.role, info.fget) for info in item_type.__mvvm_properties__.values())
+
+    def at(self, index):
+        return self._items[index]
+
+
+class _ItemRoleForwarder:
+    """
+    Observes a collection exposing per-property roles and forwards its items' property changes as dataChanged
+    carrying only the changed roles, coalesced until the next event loop iteration. Collections which aren't
+    ObservableCollections call _watch() and _unwatch() as their items come and go, and find the items' rows
+    in _rows_of().
+    """
+    def __init__(self, collection, item_type, items=None):
+        self._collection = collection
+        self._connections = {}  # id(item) -> [binding]
+        self._dirty = {}  # id(item) -> (item, {role})
+        # Constant properties have no signal and never change
+        self._roles = [(info.name, info.role) for info in item_type.__mvvm_properties__.values()
+                       if info.signal is not None]
+        for item in collection.items if items is None else items:
+            self._watch(item)
+
+    def _watch(self, item):
+        if not hasattr(item, "on_property_changed"):
+            return
+        registry = bindings(self._collection)
+        item_ref = weakref.ref(item)
+        self._connections[id(item)] = [
+            registry.bind(item, item.on_property_changed(name), functools.partial(_item_role_changed, item_ref, role))
+            for name, role in self._roles]
+
+    def _unwatch(self, item):
+        for binding in self._connections.pop(id(item), ()):
+            binding.dispose()
+        self._dirty.pop(id(item), None)
+
+    def _mark(self, item, role):
+        if not self._dirty:
+            self._collection._call_soon(self.flush)
+        self._dirty.setdefault(id(item), (item, set()))[1].add(role)
+
+    def flush(self):
+        dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        collection = self._collection
+        rows = collection._rows_of([item for item, _ in dirty.values()])
+
+        by_role = collections.defaultdict(list)
+        for item_id, (_, roles) in dirty.items():
+            row = rows.get(item_id)
+            if row is not None:
+                for role in roles:
+                    by_role[role].append(row)
+        for role, rows in by_role.items():
+            for start, stop in _index_runs(sorted(rows)):
+                collection._emit_data_changed(start, stop - 1, [role])
+
+    def _source_rows_inserted(self, index, items):
+        for item in items:
+            self._watch(item)
+
+    def _source_rows_removed(self, start, items):
+        for item in items:
+            self._unwatch(item)
+
+    def _source_rows_moved(self, start, stop, destination):
+        pass
+
+    def _source_rows_replaced(self, start, old_items, new_items):
+        self._source_rows_removed(start, old_items)
+        self._source_rows_inserted(start, new_items)
+
+    def _source_reset(self, old_items, new_items):
+        self._source_rows_removed(0, old_items)
+        self._source_rows_inserted(0, new_items)
+
+
+def _item_role_changed(item_ref, role, collection, *args):
+    item = item_ref()
+    if item is not None:
+        collection._role_forwarder._mark(item, role)
+
+
+class _RemovedItemDisposer:
+    """Observes a collection and calls dispose() on the items which are no longer in it"""
+    @staticmethod
+    def _dispose(items, kept=()):
+        kept = set(map(id, kept))
+        for item in items:
+            if id(item) not in kept:
+                dispose = getattr(item, "dispose", None)
+                if dispose is not None:
+                    dispose()
+
+    def _source_rows_inserted(self, index, items):
+        pass
+
+    def _source_rows_removed(self, start, items):
+        self._dispose(items)
+
+    def _source_rows_moved(self, start, stop, destination):
+        pass
+
+    def _source_rows_replaced(self, start, old_items, new_items):
+        self._dispose(old_items, new_items)
+
+    def _source_reset(self, old_items, new_items):
+        self._dispose(old_items, new_items)
+
+
+def _collection_operation(func):
+    # Marks a public method making several row changes as one operation, observers having a
+    # _source_operation_ended() are told once the outermost one returns (e.g. to make it one undo step)
+    @functools.wraps(func)
+    def operation(self, *args, **kwargs):
+        self._operation_depth += 1
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._operation_depth -= 1
+            if not self._operation_depth:
+                for observer in self._live_observers():
+                    ended = getattr(observer, "_source_operation_ended", None)
+                    if ended is not None:
+                        ended()
+    return operation
+
+
+class ObservableCollectionMixin(ListModelMixin):
+    # filter_remove() resets the model instead of removing row ranges once the matching rows are split into
+    # more separate runs than filter_remove_reset_threshold and than this fraction of the collection's size
+    filter_remove_reset_threshold = 64
+    filter_remove_reset_ratio = 0.05
+
+    _diff_key = id
+    _view_type = None  # Backend view class, set by each backend
+    _dead_observers = False  # Set once a view observing through a _WeakObserver is garbage collected
+    _operation_depth = 0  # Nesting of _collection_operation methods running
+
+    def __init__(self, initial_items=None, item_type=None, dispose_removed=False):
+        super().__init__()
+        self._items = initial_items or []
+        self._observers = []  # Views kept in sync through the row primitives
+        if item_type is not None:
+            self._use_item_roles(item_type)
+            self._role_forwarder = _ItemRoleForwarder(self, item_type)
+            self._observers.append(self._role_forwarder)
+        if dispose_removed:
+            self._observers.append(_RemovedItemDisposer())
+
+    def dispose(self):
+        """Disconnects the collection from its items"""
+        bindings(self).dispose()
+
+    # All mutations go through the row primitives below so each one is announced to the view once,
+    # then passed on to any views of the collection
+
+    def _live_observers(self):
+        if self._dead_observers:
+            self._dead_observers = False
+            # A new list, an iteration over the old one may still be going on further up the stack
+            self._observers = [observer for observer in self._observers
+                               if not isinstance(observer, _WeakObserver) or observer.alive]
+        return self._observers
+
+    def _insert_rows(self, index, items):
+        if not items:
+            return
+        with self._insert_context(index, index + len(items) - 1):
+            self._items[index:index] = items
+        for observer in self._live_observers():
+            observer._source_rows_inserted(index, items)
+
+    def _remove_rows(self, start, stop):
+        removed = self._items[start:stop]
+        if removed:
+            with self._remove_context(start, stop - 1):
+                del self._items[start:stop]
+            for observer in self._live_observers():
+                observer._source_rows_removed(start, removed)
+        return removed
+
+    def _remove_runs(self, runs):
+        # Removes the [start, stop) runs, ascending and apart, in one compaction pass rather than a slice deletion
+        # shifting the rows after it per run. Observers hear about them front to back, each at the row it starts
+        # at once the runs before it are gone, which is what the items read as meanwhile.
+        removed = [self._items[start:stop] for start, stop in runs]
+        compaction = self._items = _Compaction(self._items, runs)
+        try:
+            for items in removed:
+                start = compaction.next_run[0]
+                with self._remove_context(start, start + len(items) - 1):
+                    self._compact_run()
+                for observer in self._live_observers():
+                    observer._source_rows_removed(start, items)
+        finally:
+            self._items = compaction.finish()
+
+    def _compact_run(self):
+        self._items.step()
+
+    def _move_rows(self, start, stop, destination):
+        # destination is the index of the first moved row once the move is done
+        if destination == start or start >= stop:
+            return
+        with self._move_context(start, stop - 1, destination + stop - start if destination > start else destination):
+            rows = self._items[start:stop]
+            del self._items[start:stop]
+            self._items[destination:destination] = rows
+        for observer in self._live_observers():
+            observer._source_rows_moved(start, stop, destination)
+
+    def _replace_rows(self, start, items):
+        if not items:
+            return
+        old_items = self._items[start:start + len(items)]
+        with self._item_update_context(start, start + len(items) - 1):
+            self._items[start:start + len(items)] = items
+        for observer in self._live_observers():
+            observer._source_rows_replaced(start, old_items, items)
+
+    def _reset_rows(self, items):
+        old_items = self._items
+        with self._reset_model_context():
+            self._items = items
+        for observer in self._live_observers():
+            observer._source_reset(old_items, items)
+
+    def _prefer_reset(self, operations):
+        # A reset rebuilds every row of the views, it only beats that many row operations on a small collection
+        return operations > self.filter_remove_reset_threshold and \
+            operations > len(self._items) * self.filter_remove_reset_ratio
+
+    def _rows_of(self, items):
+        # id(item) -> row of each of items
+        if len(items) > 8:
+            wanted = set(map(id, items))
+            return {id(item): row for row, item in enumerate(self._items) if id(item) in wanted}
+        return {id(item): self.index_of(item) for item in items}
+
+    @_collection_operation
+    def _remove_indices(self, indices):
+        # indices must be sorted ascending without duplicates
+        runs = _index_runs(indices)
+        if self._prefer_reset(len(runs)):
+            self._reset_rows(_without_runs(self._items, runs))
+        elif runs:
+            self._remove_runs(runs)
+
+    def _insert_index(self, index):
+        # Same clamping list.insert() applies to out of range and negative indices
+        size = len(self._items)
+        if index < 0:
+            return max(size + index, 0)
+        return min(index, size)
+
+    def _range(self, start, count):
+        size = len(self._items)
+        if start < 0:
+            start += size
+        if not 0 <= start <= size or count < 0 or start + count > size:
+            raise IndexError(f"Range [{start}, {start + count}) out of range for collection of size {size}")
+        return start, start + count
+
+    def append(self, item):
+        self._insert_rows(len(self._items), [item])
+
+    def post_append(self, item):
+        """append() on the GUI thread, appends posted before the GUI thread gets to them are applied together"""
+        self._dispatcher.post_extend(self, (item,))
+
+    def post_extend(self, items):
+        """extend() on the GUI thread, see post_append()"""
+        self._dispatcher.post_extend(self, items)
+
+    def index_of(self, item):
+        return self._items.index(item)
+
+    def remove(self, item):
+        idx = self.index_of(item)
+        self._remove_rows(idx, idx + 1)
+
+    def remove_range(self, start, count):
+        return self._remove_rows(*self._range(start, count))
+
+    def filter_remove(self, func):
+        removed = []
+        indices = []
+        for i, item in enumerate(self._items):
+            if func(item):
+                removed.append(item)
+                indices.append(i)
+        self._remove_indices(indices)
+        return removed
+
+    def view(self, where=None, sort_key=None, depends_on=()):
+        return self._view_type(self, where, sort_key, depends_on)
+
+    @_collection_operation
+    def reset_to(self, new_items, key=None):
+        """
+        Updates the collection to new_items using the fewest row insertions, removals and moves.
+        Items are matched by key(item), by default their identity. Matched items which aren't the same
+        object are replaced in place.
+        """
+        new_items = list(new_items)
+        key = key or self._diff_key
+        old_keys = [key(item) for item in self._items]
+        new_keys = [key(item) for item in new_items]
+        new_rows = dict(zip(new_keys, range(len(new_keys))))
+        if len(new_rows) != len(new_keys) or len(set(old_keys)) != len(old_keys):
+            self._reset_rows(new_items)  # Can't diff without unique keys
+            return
+
+        # Rows already matching at either end are left alone
+        limit = min(len(old_keys), len(new_keys))
+        prefix = 0
+        while prefix < limit and old_keys[prefix] == new_keys[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_keys[-1 - suffix] == new_keys[-1 - suffix]:
+            suffix += 1
+        old_end = len(old_keys) - suffix
+        new_end = len(new_keys) - suffix
+
+        # Retained rows forming the longest run already in the new order stay put, the rest are moved
+        removed_runs = _index_runs([i for i in range(prefix, old_end) if old_keys[i] not in new_rows])
+        current = [k for k in old_keys[prefix:old_end] if k in new_rows]
+        retained = set(current)
+        stable = {current[i] for i in _longest_increasing_subsequence([new_rows[k] for k in current])}
+        if self._prefer_reset(len(removed_runs)) or self._prefer_reset(len(current) - len(stable)):
+            self._reset_rows(new_items)
+            return
+        for start, stop in reversed(removed_runs):
+            self._remove_rows(start, stop)
+
+        # Each row gets a slot, moved rows one for where they are and one for where they go, ordered so that
+        # the rows' order is that of their occupied slots throughout. Between two stable rows come the slots
+        # of the rows placed there, then those of the rows still to be moved away, which makes a row's index
+        # the number of occupied slots before its own.
+        old_slots = {}
+        new_slots = {}
+        occupied = []
+        i = 0
+        for t in range(prefix, new_end + 1):
+            k = new_keys[t] if t < new_end else None
+            if t < new_end and k not in stable:
+                new_slots[k] = len(occupied)
+                occupied.append(False)
+                continue
+            while i < len(current) and current[i] not in stable:
+                old_slots[current[i]] = len(occupied)
+                occupied.append(True)
+                i += 1
+            if t < new_end:
+                old_slots[k] = new_slots[k] = len(occupied)
+                occupied.append(True)
+                i += 1
+        slots = _SlotCounter(occupied)
+
+        t = prefix
+        while t < new_end:
+            k = new_keys[t]
+            if k in stable:
+                t += 1
+            elif k not in retained:
+                stop = t + 1
+                while stop < new_end and new_keys[stop] not in retained:
+                    stop += 1
+                self._insert_rows(prefix + slots.before(new_slots[k]), new_items[t:stop])
+                for inserted in new_keys[t:stop]:
+                    slots.add(new_slots[inserted], 1)
+                t = stop
+            else:
+                src = slots.before(old_slots[k])
+                count = 1
+                while (t + count < new_end and new_keys[t + count] in retained and new_keys[t + count] not in stable
+                       and slots.before(old_slots[new_keys[t + count]]) == src + count):
+                    count += 1
+                block = new_keys[t:t + count]
+                for moved in block:
+                    slots.add(old_slots[moved], -1)
+                dst = slots.before(new_slots[k])
+                self._move_rows(prefix + src, prefix + src + count, prefix + dst)
+                for moved in block:
+                    slots.add(new_slots[moved], 1)
+                t += count
+
+        replaced = _index_runs([i for i, item in enumerate(new_items) if self._items[i] is not item])
+        for start, stop in replaced:
+            self._replace_rows(start, new_items[start:stop])
+
+    def insert(self, index, item):
+        self._insert_rows(self._insert_index(index), [item])
+
+    def insert_many(self, index, items):
+        self._insert_rows(self._insert_index(index), list(items))
+
+    def extend(self, items):
+        self._insert_rows(len(self._items), list(items))
+
+    def replace(self, index, item):
+        start, _ = self._range(index, 1)
+        self._replace_rows(start, [item])
+
+    def replace_range(self, start, items):
+        items = list(items)
+        start, _ = self._range(start, len(items))
+        self._replace_rows(start, items)
+
+    def move(self, src, dst):
+        self.move_range(src, 1, dst)
+
+    def move_range(self, start, count, dst):
+        start, stop = self._range(start, count)
+        dst, _ = self._range(dst, count)
+        self._move_rows(start, stop, dst)
+
+    def clear(self):
+        self._reset_rows([])
+
+    def reverse(self):
+        self._reset_rows(self._items[::-1])
+
+
+class KeyedObservableCollectionMixin(ObservableCollectionMixin):
+    """
+    ObservableCollection which indexes its items by key(item) for O(1) lookups.
+    Keys must be unique and hashable, `key in collection` tests for a key rather than an item.
+    """
+    def __init__(self, initial_items=None, key=None, item_type=None, dispose_removed=False):
+        if key is None:
+            raise TypeError(f"{self.__class__.__name__} requires a key function")
+        super().__init__(initial_items, item_type, dispose_removed)
+        self._key = self._diff_key = key
+        self._keys = []  # Parallel to self._items
+        self._by_key = {}
+        self._rows = {}  # Key -> row, entries with a row >= self._stale_from may be outdated
+        self._stale_from = 0
+        self._index_all(self._items)
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def _new_keys(self, items, replaced=()):
+        keys = [self._key(item) for item in items]
+        unique = set(keys)
+        if len(unique) != len(keys) or any(k in self._by_key and k not in replaced for k in unique):
+            raise ValueError(f"Duplicate key inserted into {self.__class__.__name__}")
+        return keys
+
+    def _index_all(self, items):
+        # Built aside, so a rejected reset leaves the index of the items kept as it is
+        keys = [self._key(item) for item in items]
+        by_key = dict(zip(keys, items))
+        if len(by_key) != len(keys):
+            raise ValueError(f"Duplicate key inserted into {self.__class__.__name__}")
+        self._keys, self._by_key = keys, by_key
+        self._rows = {}
+        self._stale_from = 0
+
+    def _reindex(self):
+        start = self._stale_from
+        self._rows.update(zip(self._keys[start:], range(start, len(self._keys))))
+        self._stale_from = len(self._keys)
+
+    def _row(self, key):
+        row = self._rows.get(key)
+        if row is None or row >= self._stale_from:
+            if key not in self._by_key:
+                raise KeyError(key)
+            self._reindex()
+            row = self._rows[key]
+        return row
+
+    # The index is updated before calling the base primitive so views see it in sync
+
+    def _insert_rows(self, index, items):
+        keys = self._new_keys(items)
+        self._keys[index:index] = keys
+        self._by_key.update(zip(keys, items))
+        self._stale_from = min(self._stale_from, index)
+        super()._insert_rows(index, items)
+
+    def _remove_rows(self, start, stop):
+        for key in self._keys[start:stop]:
+            del self._by_key[key]
+            self._rows.pop(key, None)
+        del self._keys[start:stop]
+        self._stale_from = min(self._stale_from, start)
+        return super()._remove_rows(start, stop)
+
+    def _remove_runs(self, runs):
+        compaction = self._keys = _Compaction(self._keys, runs)
+        try:
+            super()._remove_runs(runs)
+        finally:
+            self._keys = compaction.finish()
+
+    def _compact_run(self):
+        start, stop = self._keys.next_run
+        for key in self._keys[start:stop]:
+            del self._by_key[key]
+            self._rows.pop(key, None)
+        self._keys.step()
+        self._stale_from = min(self._stale_from, start)
+        super()._compact_run()
+
+    def _move_rows(self, start, stop, destination):
+        keys = self._keys[start:stop]
+        del self._keys[start:stop]
+        self._keys[destination:destination] = keys
+        self._stale_from = min(self._stale_from, start, destination)
+        super()._move_rows(start, stop, destination)
+
+    def _replace_rows(self, start, items):
+        old_keys = self._keys[start:start + len(items)]
+        keys = self._new_keys(items, replaced=set(old_keys))
+        for key in old_keys:
+            del self._by_key[key]
+            self._rows.pop(key, None)
+        self._keys[start:start + len(items)] = keys
+        self._by_key.update(zip(keys, items))
+        if start < self._stale_from:
+            self._rows.update(zip(keys, range(start, self._stale_from)))
+        super()._replace_rows(start, items)
+
+    def _reset_rows(self, items):
+        self._index_all(items)
+        super()._reset_rows(items)
+
+    def index_of(self, item):
+        key = self._key(item)
+        if self._by_key.get(key) is not item:
+            raise ValueError(f"{item!r} is not in {self.__class__.__name__}")
+        return self._row(key)
+
+    def index_of_key(self, key):
+        return self._row(key)
+
+    def get(self, key, default=None):
+        return self._by_key.get(key, default)
+
+    def remove_key(self, key):
+        row = self._row(key)
+        return self._remove_rows(row, row + 1)[0]
+
+    def remove_keys(self, keys):
+        rows = sorted({self._row(key) for key in keys if key in self._by_key})
+        removed = [self._items[row] for row in rows]
+        self._remove_indices(rows)
+        return removed
+
+
+def _view_item_changed(item_ref, view, *args):
+    item = item_ref()
+    if item is not None:
+        view._item_changed(item)
+
+
+class _WeakObserver:
+    """
+    Passes a source collection's row changes on to an observer without keeping it alive. Once the observer is
+    garbage collected the source drops this on its next row change.
+    """
+    __slots__ = ("_observer", "_source")
+
+    def __init__(self, observer, source):
+        self._source = weakref.ref(source)
+        self._observer = weakref.ref(observer, self._observer_collected)
+
+    def _observer_collected(self, ref):
+        source = self._source()
+        if source is not None:
+            source._dead_observers = True
+
+    @property
+    def alive(self):
+        return self._observer() is not None
+
+    def _source_rows_inserted(self, index, items):
+        observer = self._observer()
+        if observer is not None:
+            observer._source_rows_inserted(index, items)
+
+    def _source_rows_removed(self, start, items):
+        observer = self._observer()
+        if observer is not None:
+            observer._source_rows_removed(start, items)
+
+    def _source_rows_moved(self, start, stop, destination):
+        observer = self._observer()
+        if observer is not None:
+            observer._source_rows_moved(start, stop, destination)
+
+    def _source_rows_replaced(self, start, old_items, new_items):
+        observer = self._observer()
+        if observer is not None:
+            observer._source_rows_replaced(start, old_items, new_items)
+
+    def _source_reset(self, old_items, new_items):
+        observer = self._observer()
+        if observer is not None:
+            observer._source_reset(old_items, new_items)
+
+
+class ObservableCollectionViewMixin(ListModelMixin):
+    """
+    Read-only view of an ObservableCollection showing the items passing where(item), ordered by sort_key(item)
+    or else by their order in the source. Source row changes are applied incrementally and items are re-tested
+    individually whenever one of their depends_on properties changes. The source only holds views weakly,
+    dispose() stops one tracking the source before it's garbage collected.
+    """
+    def __init__(self, source, where=None, sort_key=None, depends_on=()):
+        super().__init__()
+        self._source = source
+        self._where = where
+        self._sort_key = sort_key
+        self._depends_on = tuple(depends_on)
+        self._members = {}  # id(item) -> sort key (None when unsorted) of the items in the view
+        self._sort_keys = []  # Parallel to self._items when sorted
+        self._source_rows = []  # Parallel to self._items when unsorted
+        self._connections = {}  # id(item) -> [binding] for every item in the source
+        self._item_type = source._item_type
+        self._role_getters = source._role_getters
+        self._populate(source.items)
+        self._observer = _WeakObserver(self, source)
+        source._observers.append(self._observer)
+
+    @property
+    def source(self):
+        return self._source
+
+    def dispose(self):
+        """Stops tracking the source collection"""
+        if self._observer in self._source._observers:
+            self._source._observers.remove(self._observer)
+        bindings(self).dispose()
+        self._connections.clear()
+
+    def _passes(self, item):
+        return self._where is None or self._where(item)
+
+    def _populate(self, items):
+        for row, item in enumerate(items):
+            self._watch(item)
+            if self._passes(item):
+                if self._sort_key:
+                    self._insert_sorted(item, silent=True)
+                else:
+                    self._members[id(item)] = None
+                    self._items.append(item)
+                    self._source_rows.append(row)
+
+    def _watch(self, item):
+        if not self._depends_on or not hasattr(item, "on_property_changed"):
+            return
+        registry = bindings(self)
+        callback = functools.partial(_view_item_changed, weakref.ref(item))
+        self._connections[id(item)] = [registry.bind(item, item.on_property_changed(name), callback)
+                                       for name in self._depends_on]
+
+    def _unwatch_id(self, item_id):
+        for binding in self._connections.pop(item_id, ()):
+            binding.dispose()
+
+    def _position(self, item):
+        if self._sort_key:
+            key = self._members[id(item)]
+            for i in range(bisect.bisect_left(self._sort_keys, key), bisect.bisect_right(self._sort_keys, key)):
+                if self._items[i] is item:
+                    return i
+            raise ValueError(f"{item!r} is not in the view")
+        return bisect.bisect_left(self._source_rows, self._source.index_of(item))
+
+    def _insert_sorted(self, item, silent=False):
+        key = self._sort_key(item)
+        i = bisect.bisect_right(self._sort_keys, key)
+        self._members[id(item)] = key
+        if silent:
+            self._items.insert(i, item)
+            self._sort_keys.insert(i, key)
+            return
+        with self._insert_context(i, i):
+            self._items.insert(i, item)
+            self._sort_keys.insert(i, key)
+
+    def _remove_at(self, i):
+        with self._remove_context(i, i):
+            item = self._items.pop(i)
+            if self._sort_key:
+                del self._sort_keys[i]
+            else:
+                del self._source_rows[i]
+        del self._members[id(item)]
+
+    def _shift_source_rows(self, start, delta):
+        # Offsets the source rows of the view items from view position start onwards
+        self._source_rows[start:] = [row + delta for row in self._source_rows[start:]]
+
+    def _insert_unsorted(self, index, items):
+        i = bisect.bisect_left(self._source_rows, index)
+        self._shift_source_rows(i, len(items))
+        rows = [(index + n, item) for n, item in enumerate(items) if self._passes(item)]
+        if rows:
+            with self._insert_context(i, i + len(rows) - 1):
+                self._items[i:i] = [item for _, item in rows]
+                self._source_rows[i:i] = [row for row, _ in rows]
+            self._members.update((id(item), None) for _, item in rows)
+
+    def _remove_unsorted(self, start, count):
+        i = bisect.bisect_left(self._source_rows, start)
+        stop = bisect.bisect_left(self._source_rows, start + count)
+        if stop > i:
+            with self._remove_context(i, stop - 1):
+                for item in self._items[i:stop]:
+                    del self._members[id(item)]
+                del self._items[i:stop]
+                del self._source_rows[i:stop]
+        self._shift_source_rows(i, -count)
+
+    def _item_changed(self, item):
+        member = id(item) in self._members
+        passes = self._passes(item)
+        if member and not passes:
+            self._remove_at(self._position(item))
+        elif passes and not member:
+            if self._sort_key:
+                self._insert_sorted(item)
+            else:
+                row = self._source.index_of(item)
+                i = bisect.bisect_left(self._source_rows, row)
+                with self._insert_context(i, i):
+                    self._items.insert(i, item)
+                    self._source_rows.insert(i, row)
+                self._members[id(item)] = None
+        elif member and self._sort_key:
+            key = self._sort_key(item)
+            old_key = self._members[id(item)]
+            if key == old_key:
+                return
+            i = self._position(item)
+            # Final position once the item is taken out of the list
+            dst = bisect.bisect_right(self._sort_keys, key)
+            if key > old_key:
+                dst -= 1
+            self._members[id(item)] = key
+            if dst == i:
+                self._sort_keys[i] = key
+                return
+            with self._move_context(i, i, dst + 1 if dst > i else dst):
+                del self._items[i]
+                del self._sort_keys[i]
+                self._items.insert(dst, item)
+                self._sort_keys.insert(dst, key)
+
+    # Called by the source collection after each of its row primitives
+
+    def _source_rows_inserted(self, index, items):
+        for item in items:
+            self._watch(item)
+        if self._sort_key:
+            for item in items:
+                if self._passes(item):
+                    self._insert_sorted(item)
+        else:
+            self._insert_unsorted(index, items)
+
+    def _source_rows_removed(self, start, items):
+        for item in items:
+            self._unwatch_id(id(item))
+        if self._sort_key:
+            for item in items:
+                if id(item) in self._members:
+                    self._remove_at(self._position(item))
+        else:
+            self._remove_unsorted(start, len(items))
+
+    def _source_rows_moved(self, start, stop, destination):
+        if self._sort_key:
+            return
+        items = self._source[destination:destination + stop - start]
+        self._remove_unsorted(start, stop - start)
+        self._insert_unsorted(destination, items)
+
+    def _source_rows_replaced(self, start, old_items, new_items):
+        for old, new in zip(old_items, new_items):
+            self._unwatch_id(id(old))
+            self._watch(new)
+        if self._sort_key:
+            for old, new in zip(old_items, new_items):
+                if id(old) in self._members:
+                    self._remove_at(self._position(old))
+                if self._passes(new):
+                    self._insert_sorted(new)
+            return
+        for row, (old, new) in enumerate(zip(old_items, new_items), start):
+            i = bisect.bisect_left(self._source_rows, row)
+            member = i < len(self._source_rows) and self._source_rows[i] == row
+            passes = self._passes(new)
+            if member and passes:
+                with self._item_update_context(i):
+                    self._items[i] = new
+                del self._members[id(old)]
+                self._members[id(new)] = None
+            elif member:
+                self._remove_at(i)
+            elif passes:
+                with self._insert_context(i, i):
+                    self._items.insert(i, new)
+                    self._source_rows.insert(i, row)
+                self._members[id(new)] = None
+
+    def _source_reset(self, old_items, new_items):
+        # The source gives no row information on a reset so the view has to reset too
+        for item in old_items:
+            self._unwatch_id(id(item))
+        with self._reset_model_context():
+            self._items = []
+            self._sort_keys = []
+            self._source_rows = []
+            self._members = {}
+            self._populate(new_items)
+
+
+class LazyObservableCollectionMixin(ListModelMixin):
+    """
+    Read-only collection which loads its items a page at a time as the view needs them. source is either:
+    - a callable source(offset, limit) returning a sequence, so pages can be evicted and loaded again later
+    - an iterator or a DB-API cursor (anything with fetchmany()), read sequentially and kept in memory
+    count is the known or estimated number of rows, reported up front and corrected once the end of the source is
+    reached. Without it rows are added through fetch_more() as the view scrolls.
+    """
+    def __init__(self, source, page_size=100, count=None, max_pages=64, item_type=None):
+        super().__init__()
+        self._role_forwarder = None
+        if item_type is not None:
+            self._use_item_roles(item_type)
+            # Only the items of the pages in memory are watched
+            self._role_forwarder = _ItemRoleForwarder(self, item_type, ())
+        if callable(source):
+            self._fetch = source
+            self._max_pages = max_pages
+        else:
+            fetchmany = getattr(source, "fetchmany", None)
+            if fetchmany is None:
+                iterator = iter(source)
+
+                def fetchmany(size):
+                    return list(itertools.islice(iterator, size))
+            self._fetch = None
+            self._fetchmany = fetchmany
+            self._max_pages = None  # Sequential sources can't be re-read
+        self._page_size = page_size
+        self._count = count
+        self._pages = collections.OrderedDict()  # Page number -> items, least recently used first
+        self._next_page = 0  # Next page read from a sequential source
+        self._exhausted = False
+        self._available = None  # Total number of rows in the source, known once it's exhausted
+        self._fetching = False
+        self._row_count = (count() if callable(count) else count) or 0
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._row_count))]
+        if item < 0:
+            item += self._row_count
+        if not 0 <= item < self._row_count:
+            raise IndexError("LazyObservableCollection index out of range")
+        page = self._page(item // self._page_size)
+        offset = item % self._page_size
+        return page[offset] if offset < len(page) else None
+
+    def __len__(self):
+        return self._row_count
+
+    def __contains__(self, item):
+        return any(item in page for page in self._pages.values())
+
+    def __iter__(self):
+        for row in range(self._row_count):
+            yield self[row]
+
+    @property
+    def items(self):
+        """All items, loading every page"""
+        return list(self)
+
+    @property
+    def page_size(self):
+        return self._page_size
+
+    @property
+    def resident_pages(self):
+        return list(self._pages)
+
+    def _read_page(self, number):
+        if self._fetch is not None:
+            return list(self._fetch(number * self._page_size, self._page_size))
+        page = []
+        while self._next_page <= number and not self._exhausted:
+            page = list(self._fetchmany(self._page_size))
+            self._pages[self._next_page] = page
+            self._next_page += 1
+            self._source_page_read(self._next_page - 1, page)
+        return self._pages.get(number, [])
+
+    def _watch_page(self, page, watch=True):
+        if self._role_forwarder is not None:
+            for item in page:
+                if watch:
+                    self._role_forwarder._watch(item)
+                else:
+                    self._role_forwarder._unwatch(item)
+
+    def _rows_of(self, items):
+        wanted = set(map(id, items))
+        rows = {}
+        for number, page in self._pages.items():
+            for offset, item in enumerate(page):
+                row = number * self._page_size + offset
+                if id(item) in wanted and row < self._row_count:
+                    rows[id(item)] = row
+        return rows
+
+    def _source_page_read(self, number, page):
+        self._watch_page(page)
+        if len(page) < self._page_size:
+            # An empty page only tells that the source ends somewhere before it
+            available = number * self._page_size + len(page)
+            self._exhausted = True
+            self._available = available if self._available is None else min(self._available, available)
+            if self._available < self._row_count:
+                # The estimated count was too high, drop the missing rows once the view is done reading
+                self._call_soon(self._trim)
+
+    def _page(self, number):
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        page = self._read_page(number)
+        if self._fetch is not None:
+            self._pages[number] = page
+            self._source_page_read(number, page)
+            while self._max_pages and len(self._pages) > self._max_pages:
+                self._watch_page(self._pages.popitem(last=False)[1], False)
+        return page
+
+    def _trim(self):
+        if self._available < self._row_count:
+            with self._remove_context(self._available, self._row_count - 1):
+                self._row_count = self._available
+
+    def can_fetch_more(self):
+        return not self._exhausted and not self._fetching
+
+    def fetch_more(self):
+        if self._exhausted or self._fetching:
+            return  # Views may ask for more while the rows being fetched are inserted
+        number = self._row_count // self._page_size
+        page = self._page(number)
+        available = number * self._page_size + len(page)
+        if available > self._row_count:
+            self._fetching = True
+            try:
+                with self._insert_context(self._row_count, available - 1):
+                    self._row_count = available
+            finally:
+                self._fetching = False
+
+    def invalidate(self):
+        """Drops every loaded page and re-reads the count, only supported for callable sources"""
+        if self._fetch is None:
+            raise RuntimeError("Sequential sources can't be read again")
+        with self._reset_model_context():
+            for page in self._pages.values():
+                self._watch_page(page, False)
+            self._pages.clear()
+            self._exhausted = False
+            self._available = None
+            self._row_count = (self._count() if callable(self._count) else self._count) or 0
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("ColumnarObservableCollection(numpy=True) needs NumPy installed") from None
+    return numpy
+
+
+class ColumnarObservableCollectionMixin(ListModelMixin):
+    """
+    Rows of numbers stored column by column, each column an array.array or, with numpy=True, a NumPy buffer.
+    columns maps each column's name to its type: an array typecode such as "d" or "i", which NumPy also
+    accepts, or any NumPy dtype. Every column is exposed as a role named after it, rows are never turned
+    into objects unless read from python with collection[row].
+    """
+    def __init__(self, columns, numpy=False):
+        super().__init__()
+        if not columns:
+            raise ValueError("ColumnarObservableCollection needs at least one column")
+        self._np = _numpy() if numpy else None
+        if self._np is None:
+            self._columns = {name: array.array(typecode) for name, typecode in columns.items()}
+        else:
+            # Buffers grow by doubling, only the first _row_count rows are in use
+            self._columns = {name: self._np.empty(0, dtype) for name, dtype in columns.items()}
+        self._row_count = 0
+        self._column_roles = {name: MODEL_DATA_ROLE + 1 + i for i, name in enumerate(self._columns)}
+        self._role_columns = {role: self._columns[name] for name, role in self._column_roles.items()}
+        self._role_columns[DISPLAY_ROLE] = next(iter(self._columns.values()))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._row_count))]
+        if item < 0:
+            item += self._row_count
+        if not 0 <= item < self._row_count:
+            raise IndexError("ColumnarObservableCollection index out of range")
+        return tuple(self._value(column, item) for column in self._columns.values())
+
+    def __len__(self):
+        return self._row_count
+
+    def __contains__(self, item):
+        return any(row == item for row in self)
+
+    def __iter__(self):
+        for row in range(self._row_count):
+            yield self[row]
+
+    @property
+    def items(self):
+        """Every row as a tuple of its values, prefer column() for large collections"""
+        return list(self)
+
+    @property
+    def column_names(self):
+        return list(self._columns)
+
+    def column(self, name):
+        """The values of a column as a read-only view, without copying. Changes go through update_range()"""
+        column = self._columns[name]
+        if self._np is None:
+            return memoryview(column).toreadonly()
+        view = column[:self._row_count]
+        view.flags.writeable = False
+        return view
+
+    def value(self, row, name):
+        if not 0 <= row < self._row_count:
+            raise IndexError("ColumnarObservableCollection index out of range")
+        return self._value(self._columns[name], row)
+
+    def _value(self, column, row):
+        value = column[row]
+        return value if self._np is None else value.item()  # Plain python numbers for the views
+
+    def at(self, index):
+        return self[index]
+
+    def _role_value(self, row, role):
+        if not 0 <= row < self._row_count:
+            return None
+        if role == MODEL_DATA_ROLE:
+            return list(self[row])
+        column = self._role_columns.get(role)
+        return None if column is None else self._value(column, row)
+
+    def _check_columns(self, columns, require_all):
+        unknown = columns.keys() - self._columns.keys()
+        if unknown:
+            raise KeyError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        if require_all and len(columns) != len(self._columns):
+            missing = self._columns.keys() - columns.keys()
+            raise ValueError(f"Values needed for every column, missing: {', '.join(sorted(missing))}")
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Every column needs the same number of values")
+        return lengths.pop() if lengths else 0
+
+    def _as_array(self, name, values):
+        column = self._columns[name]
+        if self._np is not None:
+            return self._np.asarray(values, dtype=column.dtype)
+        if isinstance(values, array.array) and values.typecode == column.typecode:
+            return values
+        if hasattr(values, "dtype"):  # NumPy array passed without numpy=True, converted without iterating it
+            return array.array(column.typecode, values.astype(column.typecode, copy=False).tobytes())
+        return array.array(column.typecode, values)
+
+    def extend_columns(self, columns=None, **kwargs):
+        """
+        Appends rows given as one sequence of values per column, by name, every column getting the same
+        number of values. Views hear about it as one insertion.
+        """
+        columns = dict(columns or {}, **kwargs)
+        count = self._check_columns(columns, True)
+        if not count:
+            return
+        values = {name: self._as_array(name, column) for name, column in columns.items()}
+        start, stop = self._row_count, self._row_count + count
+        with self._insert_context(start, stop - 1):
+            if self._np is None:
+                for name, column in values.items():
+                    self._resize_column(name, lambda array_column: array_column.extend(column))
+            else:
+                self._reserve(stop)
+                for name, column in values.items():
+                    self._columns[name][start:stop] = column
+            self._row_count = stop
+
+    def append_row(self, *values, **kwargs):
+        """Appends one row, its values in column order or by name"""
+        columns = dict(zip(self._columns, values), **kwargs)
+        self.extend_columns({name: (value,) for name, value in columns.items()})
+
+    def update_range(self, start, columns=None, **kwargs):
+        """
+        Overwrites rows from start on with one sequence of values per column, columns not given are left
+        alone. Views hear about it as one data change of the affected rows and roles.
+        """
+        columns = dict(columns or {}, **kwargs)
+        count = self._check_columns(columns, False)
+        if not count:
+            return
+        stop = start + count
+        if start < 0 or stop > self._row_count:
+            raise IndexError(f"Rows {start} to {stop - 1} out of range for {self._row_count} rows")
+        for name, column in columns.items():
+            self._columns[name][start:stop] = self._as_array(name, column)
+        self._emit_data_changed(start, stop - 1, [self._column_roles[name] for name in columns])
+
+    def remove_range(self, start, count):
+        stop = start + count
+        if start < 0 or count < 0 or stop > self._row_count:
+            raise IndexError(f"Rows {start} to {stop - 1} out of range for {self._row_count} rows")
+        if not count:
+            return
+        with self._remove_context(start, stop - 1):
+            for name, column in self._columns.items():
+                if self._np is None:
+                    self._resize_column(name, lambda array_column: array_column.__delitem__(slice(start, stop)))
+                else:
+                    column[start:self._row_count - (stop - start)] = column[stop:self._row_count]
+            self._row_count -= stop - start
+
+    def clear(self):
+        with self._reset_model_context():
+            for name, column in self._columns.items():
+                if self._np is None:
+                    self._replace_column(name, array.array(column.typecode))
+                else:
+                    self._replace_column(name, column[:0].copy())
+            self._row_count = 0
+
+    def _reserve(self, rows):
+        for name, column in self._columns.items():
+            if len(column) < rows:
+                grown = self._np.empty(max(rows, 2 * len(column), 16), column.dtype)
+                grown[:self._row_count] = column[:self._row_count]
+                self._replace_column(name, grown)
+
+    def _resize_column(self, name, resize):
+        # An array can't be resized while column() views of it exist, they keep the values they had then
+        column = self._columns[name]
+        try:
+            resize(column)
+        except BufferError:
+            column = array.array(column.typecode, column)
+            resize(column)
+            self._replace_column(name, column)
+
+    def _replace_column(self, name, column):
+        self._columns[name] = column
+        self._role_columns[self._column_roles[name]] = column
+        self._role_columns[DISPLAY_ROLE] = self._role_columns[MODEL_DATA_ROLE + 1]
+
+
+class RingObservableCollectionMixin(ListModelMixin):
+    """
+    Collection keeping the last maxlen items appended, in a circular buffer. Appending to a full collection
+    evicts items from the front, notified as one removal of the first rows followed by one insertion per
+    append() or extend(). With follow_tail, appends are held back and added together once the event loop
+    iterates, or on flush(), so bursts arriving faster than views repaint cost one insertion per tick.
+    """
+    def __init__(self, maxlen, initial_items=None, item_type=None, follow_tail=False):
+        super().__init__()
+        if maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self._role_forwarder = None
+        if item_type is not None:
+            self._use_item_roles(item_type)
+            self._role_forwarder = _ItemRoleForwarder(self, item_type, ())
+        self._buffer = [None] * maxlen
+        self._head = 0  # Buffer position of the first row
+        self._size = 0
+        self._pending = collections.deque(maxlen=maxlen)  # Appends waiting for flush() when following the tail
+        self._flush_scheduled = False
+        self._follow_tail = follow_tail
+        if initial_items:
+            self._store(list(initial_items)[-maxlen:])
+
+    def _position(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RingObservableCollection index out of range")
+        return (self._head + index) % len(self._buffer)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._size))]
+        return self._buffer[self._position(item)]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, item):
+        return any(value is item or value == item for value in self)
+
+    def __iter__(self):
+        buffer, head, maxlen = self._buffer, self._head, len(self._buffer)
+        for i in range(self._size):
+            yield buffer[(head + i) % maxlen]
+
+    @property
+    def items(self):
+        return list(self)
+
+    def at(self, index):
+        return self[index]
+
+    @property
+    def maxlen(self) -> int:
+        return len(self._buffer)
+
+    def _rows_of(self, items):
+        wanted = set(map(id, items))
+        return {id(item): row for row, item in enumerate(self) if id(item) in wanted}
+
+    @property
+    def follow_tail(self) -> bool:
+        return self._follow_tail
+
+    @follow_tail.setter
+    def follow_tail(self, value):
+        self._follow_tail = value
+        if not value:
+            self.flush()
+
+    def append(self, item):
+        if self._follow_tail:
+            self._pending.append(item)
+            self._schedule_flush()
+        else:
+            self._add([item])
+
+    def extend(self, items):
+        if self._follow_tail:
+            self._pending.extend(items)
+            if self._pending:
+                self._schedule_flush()
+        else:
+            self._add(list(items)[-len(self._buffer):])
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._call_soon(self._scheduled_flush)
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+    def flush(self):
+        """Adds the items held back by follow_tail now"""
+        if self._pending:
+            items = list(self._pending)
+            self._pending.clear()
+            self._add(items)
+
+    def _add(self, items):
+        # At most maxlen items, making room for them first
+        if not items:
+            return
+        evicted = min(self._size, self._size + len(items) - len(self._buffer))
+        if evicted > 0:
+            with self._remove_context(0, evicted - 1):
+                self._evict(evicted)
+        with self._insert_context(self._size, self._size + len(items) - 1):
+            self._store(items)
+
+    def _store(self, items):
+        buffer, maxlen = self._buffer, len(self._buffer)
+        tail = (self._head + self._size) % maxlen
+        first = min(len(items), maxlen - tail)
+        buffer[tail:tail + first] = items[:first]
+        buffer[:len(items) - first] = items[first:]
+        self._size += len(items)
+        if self._role_forwarder is not None:
+            for item in items:
+                self._role_forwarder._watch(item)
+
+    def _evict(self, count):
+        buffer, maxlen = self._buffer, len(self._buffer)
+        for i in range(count):
+            position = (self._head + i) % maxlen
+            if self._role_forwarder is not None:
+                self._role_forwarder._unwatch(buffer[position])
+            buffer[position] = None
+        self._head = (self._head + count) % maxlen
+        self._size -= count
+
+    def clear(self):
+        self._pending.clear()
+        with self._reset_model_context():
+            if self._role_forwarder is not None:
+                for item in self:
+                    self._role_forwarder._unwatch(item)
+            self._buffer = [None] * len(self._buffer)
+            self._head = 0
+            self._size = 0
+
+
+def _merge_intervals(intervals):
+    # Sorted, merged [left, right] intervals, touching ones joined
+    merged = []
+    for left, right in sorted(intervals):
+        if merged and left <= merged[-1][1] + 1:
+            if right > merged[-1][1]:
+                merged[-1] = (merged[-1][0], right)
+        else:
+            merged.append((left, right))
+    return tuple(merged)
+
+
+def _coalesce_rects(rects):
+    """
+    Few (top, left, bottom, right) rectangles, bounds included, covering the cells of rects. Sweeps the rows
+    where rectangles start or end, so the cost depends on the number of rectangles rather than their area.
+    """
+    if len(rects) == 1:
+        return rects
+    starts = collections.defaultdict(list)
+    ends = collections.defaultdict(list)
+    for rect in rects:
+        starts[rect[0]].append((rect[1], rect[3]))
+        ends[rect[2] + 1].append((rect[1], rect[3]))
+
+    result = []
+    active = collections.Counter()  # Column interval -> rectangles covering the current rows with it
+    band = None  # [top, bottom, intervals] of the rows with the same intervals so far
+    bounds = sorted(starts.keys() | ends.keys())
+    for top, next_top in zip(bounds, bounds[1:]):
+        for interval in ends.get(top, ()):
+            active[interval] -= 1
+            if not active[interval]:
+                del active[interval]
+        for interval in starts.get(top, ()):
+            active[interval] += 1
+        intervals = _merge_intervals(active)
+        if band is not None and band[2] == intervals:
+            band[1] = next_top - 1
+            continue
+        if band is not None:
+            result.extend((band[0], left, band[1], right) for left, right in band[2])
+        band = [top, next_top - 1, intervals]
+    if band is not None:
+        result.extend((band[0], left, band[1], right) for left, right in band[2])
+    return result
+
+
+class ObservableTableMixin:
+    """
+    Table of values, each row a list, with optional column headers. Cell changes are collected as dirty
+    rectangles and notified as few merged ranges once the event loop iterates, or on flush_changes().
+    Row and column insertions and removals notify at once, after flushing the cell changes pending.
+    Backends provide the row and column change contexts, _emit_cells_changed(), _emit_header_changed()
+    and _call_soon().
+    """
+    def __init__(self, rows=None, headers=None):
+        super().__init__()
+        self._rows = [list(row) for row in rows or ()]
+        self._column_count = len(headers) if headers is not None else max(map(len, self._rows), default=0)
+        self._headers = list(headers) if headers is not None else [None] * self._column_count
+        self._check_rows(self._rows, self._column_count)
+        self._dirty = []  # (top, left, bottom, right) changed since the last flush
+
+    @staticmethod
+    def _check_rows(rows, column_count):
+        for row in rows:
+            if len(row) != column_count:
+                raise ValueError(f"Rows need {column_count} values, got {len(row)}")
+
+    def _check_cell(self, row, column):
+        if not (0 <= row < len(self._rows) and 0 <= column < self._column_count):
+            raise IndexError(f"Cell ({row}, {column}) out of range for {len(self._rows)}x{self._column_count}")
+
+    def __getitem__(self, cell):
+        row, column = cell
+        return self.cell(row, column)
+
+    def __setitem__(self, cell, value):
+        row, column = cell
+        self.set_cell(row, column, value)
+
+    @property
+    def rows(self):
+        """The rows, not to be modified directly"""
+        return self._rows
+
+    @property
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    @property
+    def column_count(self) -> int:
+        return self._column_count
+
+    @property
+    def headers(self):
+        return list(self._headers)
+
+    def row(self, index):
+        return list(self._rows[index])
+
+    def column(self, index):
+        return [row[index] for row in self._rows]
+
+    def cell(self, row, column):
+        self._check_cell(row, column)
+        return self._rows[row][column]
+
+    def set_cell(self, row, column, value):
+        self._check_cell(row, column)
+        self._rows[row][column] = value
+        self._mark(row, column, row, column)
+
+    def update_cells(self, changes):
+        """Sets (row, column, value) cells, notified together once they're merged into ranges"""
+        rows = self._rows
+        for row, column, value in changes:
+            self._check_cell(row, column)
+            rows[row][column] = value
+            self._mark(row, column, row, column)
+
+    def set_block(self, row, column, values):
+        """Overwrites the cells from (row, column) on with values, a sequence of row sequences"""
+        values = [list(block_row) for block_row in values]
+        if not values or not values[0]:
+            return
+        width = len(values[0])
+        self._check_rows(values, width)
+        self._check_cell(row, column)
+        self._check_cell(row + len(values) - 1, column + width - 1)
+        for target, block_row in zip(self._rows[row:row + len(values)], values):
+            target[column:column + width] = block_row
+        self._mark(row, column, row + len(values) - 1, column + width - 1)
+
+    def set_header(self, column, header):
+        self._headers[column] = header
+        self._emit_header_changed(column, column)
+
+    def _mark(self, top, left, bottom, right):
+        if not self._dirty:
+            self._call_soon(self.flush_changes)
+        self._dirty.append((top, left, bottom, right))
+
+    def flush_changes(self):
+        """Notifies the cell changes pending now, rather than once the event loop iterates"""
+        dirty, self._dirty = self._dirty, []
+        if dirty:
+            for top, left, bottom, right in _coalesce_rects(dirty):
+                self._emit_cells_changed(top, left, bottom, right)
+
+    def insert_rows(self, index, rows):
+        rows = [list(row) for row in rows]
+        if not rows:
+            return
+        self._check_rows(rows, self._column_count)
+        index = max(0, min(index, len(self._rows)))
+        self.flush_changes()
+        with self._insert_context(index, index + len(rows) - 1):
+            self._rows[index:index] = rows
+
+    def append_rows(self, rows):
+        self.insert_rows(len(self._rows), rows)
+
+    def remove_rows(self, start, count=1):
+        stop = start + count
+        if start < 0 or count < 0 or stop > len(self._rows):
+            raise IndexError(f"Rows {start} to {stop - 1} out of range for {len(self._rows)} rows")
+        if not count:
+            return
+        self.flush_changes()
+        with self._remove_context(start, stop - 1):
+            del self._rows[start:stop]
+
+    def insert_columns(self, index, columns, headers=None):
+        """Inserts columns given as sequences of values, one per row"""
+        columns = [list(column) for column in columns]
+        if not columns:
+            return
+        self._check_rows(columns, len(self._rows))
+        if headers is not None and len(headers) != len(columns):
+            raise ValueError(f"{len(columns)} headers needed, got {len(headers)}")
+        index = max(0, min(index, self._column_count))
+        self.flush_changes()
+        with self._insert_columns_context(index, index + len(columns) - 1):
+            for row, values in zip(self._rows, zip(*columns)):
+                row[index:index] = values
+            self._headers[index:index] = headers if headers is not None else [None] * len(columns)
+            self._column_count += len(columns)
+
+    def append_columns(self, columns, headers=None):
+        self.insert_columns(self._column_count, columns, headers)
+
+    def remove_columns(self, start, count=1):
+        stop = start + count
+        if start < 0 or count < 0 or stop > self._column_count:
+            raise IndexError(f"Columns {start} to {stop - 1} out of range for {self._column_count} columns")
+        if not count:
+            return
+        self.flush_changes()
+        with self._remove_columns_context(start, stop - 1):
+            for row in self._rows:
+                del row[start:stop]
+            del self._headers[start:stop]
+            self._column_count -= stop - start
+
+    def reset(self, rows=(), headers=None):
+        """Replaces the whole table, keeping the headers if none are given and the column count is unchanged"""
+        rows = [list(row) for row in rows]
+        column_count = len(headers) if headers is not None else \
+            len(rows[0]) if rows else self._column_count
+        self._check_rows(rows, column_count)
+        self._dirty = []
+        with self._reset_model_context():
+            self._rows = rows
+            if headers is not None:
+                self._headers = list(headers)
+            elif column_count != self._column_count:
+                self._headers = [None] * column_count
+            self._column_count = column_count
+
+    def clear(self):
+        self.reset((), self._headers)
+
+
+class Property(property):
+    def __init__(self, type_=None, fget=None, fset=None, fdel=None, doc=None, constant=False, field=None, notify=True,
+                 depends_on=(), throttle_ms=None, debounce_ms=None):
+        if throttle_ms is not None and debounce_ms is not None:
+            raise ValueError("A Property can't be both throttled and debounced")
+        self.type = type_
+        self.constant = constant
+        self.field = field
+        self.notify = notify
+        self.depends_on = tuple(depends_on)
+        self.throttle_ms = throttle_ms
+        self.debounce_ms = debounce_ms
+        super().__init__(fget=fget, fset=fset, fdel=fdel, doc=doc)
+
+    def __call__(self, fget=None, fset=None, fdel=None, doc=None):
+        super(Property, self).__init__(fget, fset, fdel, doc)
+        return self
+
+    def getter(self, fget):
+        return self._copy(fget, self.fset, self.fdel)
+
+    def setter(self, fset):
+        return self._copy(self.fget, fset, self.fdel)
+
+    def deleter(self, fdel):
+        return self._copy(self.fget, self.fset, fdel)
+
+    def _copy(self, fget, fset, fdel):
+        return self.__class__(self.type, fget, fset, fdel, self.__doc__, self.constant, self.field, self.notify,
+                              self.depends_on, self.throttle_ms, self.debounce_ms)
+
+
+# Maps the code object of each property setter to its property name so
+# _notify_property_changed() can resolve a missing name without inspecting the stack
+_setter_property_names = {}
+
+
+def _field_getter(field):
+    def fget(self):
+        return getattr(self, field)
+    return fget
+
+
+def _field_setter(name, field, signal, notify):
+    if not notify:
+        def fset(self, value):
+            setattr(self, field, value)
+        return fset
+
+    def fset(self, value):
+        if getattr(self, field) == value:
+            return
+        setattr(self, field, value)
+        self._emit_property_changed(name, signal.__get__(self, type(self)))
+    return fset
+
+
+def _change_signal(obj, name):
+    # The signal notifying changes of obj.name, None if obj doesn't notify or the property is constant
+    on_property_changed = getattr(obj, "on_property_changed", None)
+    if on_property_changed is None:
+        return None
+    try:
+        return on_property_changed(name)
+    except AttributeError:
+        if hasattr(type(obj), name):
+            return None
+        raise
+
+
+class _DependencyPath:
+    """
+    Calls changed() whenever a property along a dotted path from root changes. The parts after a changed
+    property are rebound to its new value. The connections are bindings of root.
+    """
+    def __init__(self, root, path, changed):
+        self._names = path.split(".")
+        self._changed = changed
+        self._root = weakref.ref(root)
+        self._holders = []  # Object holding each part after the first
+        self._connections = []  # Binding of each part, None for parts which don't notify
+        self._bind(0, root)
+
+    def _bind(self, level, obj):
+        for binding in self._connections[level:]:
+            if binding is not None:
+                binding.dispose()
+        del self._connections[level:]
+        del self._holders[max(level - 1, 0):]
+        for i in range(level, len(self._names)):
+            if obj is None:
+                return
+            if i:
+                self._holders.append(obj)
+            signal = _change_signal(obj, self._names[i])
+            if signal is None:
+                self._connections.append(None)
+            else:
+                root = self._root()
+                self._connections.append(bindings(root).bind(obj, signal, functools.partial(self._part_changed, i)))
+            if i + 1 < len(self._names):
+                obj = getattr(obj, self._names[i])
+
+    def _part_changed(self, level, root, *args):
+        if level + 1 < len(self._names):
+            holder = root if level == 0 else self._holders[level - 1]
+            self._bind(level + 1, getattr(holder, self._names[level]))
+        self._changed()
+
+
+_NOT_COMPUTED = object()
+
+
+def _computed_getter(name, fget, depends_on):
+    # Caches the value per instance, binding the dependencies on first read so unread properties cost nothing
+    def cached_fget(self):
+        cache = self.__dict__.get("_mvvm_computed")
+        if cache is None:
+            cache = self.__dict__["_mvvm_computed"] = {}
+            bindings(self).on_dispose(cache.clear)  # Unbound values are recomputed and bound again when read
+        value = cache.get(name, _NOT_COMPUTED)
+        if value is _NOT_COMPUTED:
+            value = cache[name] = fget(self)
+            changed = functools.partial(_recompute, weakref.ref(self), name, fget)
+            for path in depends_on:
+                _DependencyPath(self, path, changed)
+        return value
+    return cached_fget
+
+
+def _recompute(model_ref, name, fget):
+    model = model_ref()
+    if model is None:
+        return
+    cache = model.__dict__["_mvvm_computed"]
+    if name not in cache:
+        return
+    value = fget(model)
+    if cache[name] != value:
+        cache[name] = value
+        model._notify_property_changed(name)
+
+
+# Factories of the executors, resolved on first use as the process pool pulls in multiprocessing
+_default_executors = {
+    "thread": lambda: concurrent.futures.ThreadPoolExecutor(),
+    "process": lambda: concurrent.futures.ProcessPoolExecutor(),
+}
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def set_executor(name, executor):
+    """
+    Sets the concurrent.futures executor used by Commands with executor=name, replacing the default
+    ThreadPoolExecutor/ProcessPoolExecutor for "thread"/"process". Other names must be set before use.
+    """
+    with _executors_lock:
+        _executors[name] = executor
+
+
+def get_executor(name):
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if name not in _default_executors:
+                raise ValueError(f"No executor named '{name}', use set_executor() to add it")
+            executor = _executors[name] = _default_executors[name]()
+            # Before interpreter teardown, which may already have cleared what the pool needs to shut down
+            atexit.register(executor.shutdown)
+        return executor
+
+
+class Command:
+    """
+    Marks a method as invokable from the view.
+
+    Commands which shouldn't block the GUI thread are run in the background, getting <name>_is_running and
+    <name>_can_execute properties:
+    - An async def method runs as a task on the asyncio loop (see AsyncRunner).
+    - With executor set ("thread", "process" or a name given to set_executor()) the method runs on that
+      executor. It is called with the invocation's arguments only, without the model, which mustn't be
+      touched off the GUI thread. For process executors its class must be importable from its module,
+      where the worker process finds it, and its arguments and result picklable.
+
+    The result is assigned to the target property and passed to on_done(result, error), a method name or
+    function taking the model first, on the GUI thread. Errors without on_done go to sys.excepthook.
+    policy decides what invoking a command which is still running does: "restart" supersedes the running
+    invocation, whose result is then dropped, "drop" ignores the new invocation and makes
+    <name>_can_execute False while running.
+    """
+    POLICIES = ("restart", "drop")
+
+    def __init__(self, *types, name=None, result=None, policy="restart", executor=None, on_done=None, target=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown command policy '{policy}'. Supported policies: {', '.join(self.POLICIES)}")
+        self.types = types
+        self.name = name
+        self.result = result
+        self.policy = policy
+        self.executor = executor
+        self.on_done = on_done
+        self.target = target
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            if self.executor is not None:
+                raise ValueError(f"async def Command {func.__qualname__} can't have an executor")
+            return _BackgroundCommand(func, self)
+        if self.executor is not None:
+            return _BackgroundCommand(func, self)
+        if self.on_done is not None or self.target is not None:
+            raise ValueError(f"Command {func.__qualname__} needs an executor or async def to have on_done/target")
+        return _command_invoker(self._slot(func))
+
+    def _slot(self, func):
+        # Backends mark func as invokable from their views
+        return func
+
+
+def _command_invoker(func):
+    # Marked so instrumentation can find the commands of model classes
+    func._mvvm_command = True
+    return func
+
+
+def _is_process_pool(executor):
+    # Without importing concurrent.futures.process, no ProcessPoolExecutor exists before it's imported
+    process = sys.modules.get("concurrent.futures.process")
+    return process is not None and isinstance(executor, process.ProcessPoolExecutor)
+
+
+def _run_in_process(module, qualname, *args):
+    # What process executors run for a Command. A function defined in a class body is pickled by its
+    # qualified name, which finds the command's invoker once the class is built, so the worker imports
+    # the invoker and calls the function it wraps.
+    func = importlib.import_module(module)
+    for name in qualname.split("."):
+        func = getattr(func, name)
+    return inspect.unwrap(func)(*args)
+
+
+class _BackgroundCommand:
+    """A Command run in the background, expanded into its invoker and state properties by build_properties()"""
+    def __init__(self, func, command):
+        self.func = func
+        self.command = command
+
+    def expand(self, name, attrs):
+        func, command, policy = self.func, self.command, self.command.policy
+        running_name, can_execute_name = f"{name}_is_running", f"{name}_can_execute"
+
+        if command.executor is not None:
+            def start(model, tasks, args):
+                executor = get_executor(command.executor)
+                if _is_process_pool(executor) and "<locals>" not in func.__qualname__:
+                    future = executor.submit(_run_in_process, func.__module__, func.__qualname__, *args)
+                else:
+                    future = executor.submit(func, *args)
+                # Done callbacks run on the executor's threads
+                future.add_done_callback(lambda f: model._dispatcher.post(finished, model, tasks, f))
+                return future
+        else:
+            def start(model, tasks, args):
+                task = model._async_runner.create_task(func(model, *args))
+                task.add_done_callback(functools.partial(finished, model, tasks))
+                return task
+
+        @functools.wraps(func)
+        def invoke(model, *args):
+            tasks = model._command_tasks()
+            running = tasks.get(name)
+            if running is not None:
+                if policy == "drop":
+                    return None
+                running.cancel()  # Its completion no longer affects the state, the new task replaces it
+            task = tasks[name] = start(model, tasks, args)
+            if running is None:
+                changed(model)
+            return task
+
+        def finished(model, tasks, task):
+            if tasks.get(name) is not task:
+                return  # Superseded or the model is gone
+            del tasks[name]
+            changed(model)
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is None and command.target is not None:
+                setattr(model, command.target, task.result())
+            if command.on_done is not None:
+                on_done = command.on_done
+                if isinstance(on_done, str):
+                    getattr(model, on_done)(None if error else task.result(), error)
+                else:
+                    on_done(model, None if error else task.result(), error)
+            elif error is not None:
+                sys.excepthook(type(error), error, error.__traceback__)
+
+        def changed(model):
+            model._notify_property_changed(running_name)
+            if policy == "drop":
+                model._notify_property_changed(can_execute_name)
+
+        def is_running(model):
+            return name in model._command_tasks()
+
+        def can_execute(model):
+            return policy != "drop" or not is_running(model)
+
+        attrs[name] = _command_invoker(command._slot(invoke))
+        attrs[running_name] = Property(bool, is_running)
+        attrs[can_execute_name] = Property(bool, can_execute)
+
+
+class AsyncRunner:
+    """
+    Runs the tasks of async Commands. They go onto the asyncio loop already running on the calling thread
+    if there is one (e.g. with qasync), otherwise onto a loop owned by the runner which the backend steps by
+    calling step() regularly from the moment set_stepping(True) is called until set_stepping(False).
+    """
+    def __init__(self, set_stepping):
+        self._set_stepping = set_stepping
+        self._loop = None
+        self._stepping = False
+
+    def create_task(self, coroutine):
+        import asyncio  # Only once there are async Commands, it's slow to import
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            loop = self._loop
+            if not self._stepping:
+                self._stepping = True
+                self._set_stepping(True)
+        return loop.create_task(coroutine)
+
+    def step(self):
+        """Runs one iteration of the runner's loop, without waiting for I/O or timers"""
+        loop = self._loop
+        if loop is None or loop.is_running():
+            return
+        import asyncio
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        if self._stepping and not asyncio.all_tasks(loop):
+            # One more iteration runs the done callbacks of the tasks which just finished
+            loop.call_soon(loop.stop)
+            loop.run_forever()
+            if not asyncio.all_tasks(loop):
+                self._stepping = False
+                self._set_stepping(False)
+
+
+class TimerWheel:
+    """
+    Calls callbacks after a delay, for every model sharing one backend timer. Callbacks are hashed into
+    slots of resolution seconds and run on the first step() at or after their deadline, so never early and
+    at most about one resolution late. The backend calls step() regularly from the moment
+    set_ticking(True) is called until set_ticking(False), which happens once no callback is left.
+    """
+    def __init__(self, resolution, set_ticking, slots=256):
+        self.resolution = resolution
+        self._set_ticking = set_ticking
+        self._slots = [[] for _ in range(slots)]
+        self._tick = None  # Last tick stepped through, None while idle
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def call_later(self, delay, callback):
+        """Calls callback() once delay seconds have passed"""
+        now = time.monotonic()
+        if self._tick is None:
+            self._tick = math.floor(now / self.resolution) - 1
+            self._set_ticking(True)
+        due = max(math.ceil((now + delay) / self.resolution), self._tick + 1)
+        self._slots[due % len(self._slots)].append((due, callback))
+        self._size += 1
+
+    def step(self):
+        if self._tick is None:
+            return
+        now = math.floor(time.monotonic() / self.resolution)
+        slots = self._slots
+        first = max(self._tick + 1, now - len(slots) + 1)  # After a long stall one lap covers every slot
+        self._tick = now
+        for tick in range(first, now + 1):
+            slot = slots[tick % len(slots)]
+            if not slot:
+                continue
+            due = [entry for entry in slot if entry[0] <= now]
+            if due:
+                slot[:] = [entry for entry in slot if entry[0] > now]
+                self._size -= len(due)
+                for _, callback in due:
+                    callback()
+        if not self._size and self._tick is not None:
+            self._tick = None
+            self._set_ticking(False)
+
+
+def _cancel_tasks(tasks):
+    for task in tuple(tasks.values()):
+        task.cancel()
+
+
+def _abandon_tasks(tasks, *args):
+    # The model is disposed or gone, cancels its tasks without notifying through it once they finish
+    running = tuple(tasks.values())
+    tasks.clear()
+    for task in running:
+        task.cancel()
+
+
+class PropertyInfo(NamedTuple):
+    """One Property of a model class, as listed in its __mvvm_properties__"""
+    name: str
+    type: Any
+    constant: bool
+    signal: Any  # Class level notify signal, signal.__get__(model) gives the model's. None when constant
+    fget: Callable
+    fset: Optional[Callable]
+    role: int  # Role exposing the property in collections with this item_type
+    field: Optional[str] = None  # Backing field
+    depends_on: tuple = ()  # Dependencies of a computed property
+    throttle_ms: Optional[float] = None  # Notifies at most once per interval
+    debounce_ms: Optional[float] = None  # Notifies once changes paused for the interval
+
+
+def _property_table(bases, infos):
+    # Properties of the bases followed by the class's own, an override keeping the overridden one's role
+    merged = {}
+    for base in reversed(bases):
+        merged.update(getattr(base, "__mvvm_properties__", {}))
+    merged.update(infos)
+    return types.MappingProxyType({name: info._replace(role=MODEL_DATA_ROLE + 1 + i)
+                                   for i, (name, info) in enumerate(merged.items())})
+
+
+def build_properties(bases, attrs, make_signal, make_property, on_property_type=None):
+    """
+    Replaces each Property in a model class's attrs by the backend's property made with
+    make_property(type, fget, fset, notify_signal), notify_signal being None for constant properties,
+    and describes them all, inherited ones included, in attrs["__mvvm_properties__"].
+    """
+    for key, value in tuple(attrs.items()):
+        if isinstance(value, _BackgroundCommand):
+            value.expand(key, attrs)
+
+    infos = {}
+    for key in tuple(attrs.keys()):
+        value = attrs[key]
+        if isinstance(value, Property):
+            fget, fset = value.fget, value.fset
+            if value.field:
+                fget = fget or _field_getter(value.field)
+            if value.depends_on:
+                fget = _computed_getter(key, fget, value.depends_on)
+            if hasattr(fset, "__code__"):
+                _setter_property_names[fset.__code__] = key
+
+            if value.constant:
+                signal = None
+                attrs[key] = make_property(value.type, fget, fset, None)
+            else:
+                signal = make_signal()
+                if value.field and not fset:
+                    fset = _field_setter(key, value.field, signal, value.notify)
+                attrs[f"_{key}_property_signal"] = signal
+                attrs[key] = make_property(value.type, fget, fset, signal)
+            infos[key] = PropertyInfo(key, value.type, value.constant, signal, fget, fset, 0, value.field,
+                                      value.depends_on, value.throttle_ms, value.debounce_ms)
+            if on_property_type:
+                on_property_type(value.type)
+    attrs["__mvvm_properties__"] = _property_table(bases, infos)
+    if any(info.throttle_ms or info.debounce_ms for info in infos.values() if info.signal is not None):
+        # Only these classes pay for looking up how each notification is limited
+        attrs["_emit_property_changed"] = _rate_limited_emit_property_changed
+
+
+class _StartupTimings:
+    """Where mvvm.use() and model class creation spent their time, see mvvm.startup_report()"""
+    def __init__(self):
+        self.framework = None
+        self.use = 0.0  # Importing and installing the backend, its own classes included
+        self.classes = {}  # "module.qualname" -> seconds spent creating the model class
+        self.type_registration = 0.0
+        self.registered_types = 0
+
+    def class_created(self, cls, seconds):
+        self.classes[f"{cls.__module__}.{cls.__qualname__}"] = seconds
+
+    def report(self):
+        return {
+            "framework": self.framework,
+            "use": self.use,
+            "class_creation": sum(self.classes.values()),
+            "classes": dict(sorted(self.classes.items(), key=lambda item: item[1], reverse=True)),
+            "type_registration": self.type_registration,
+            "registered_types": self.registered_types,
+        }
+
+
+startup_timings = _StartupTimings()
+
+
+class _NotificationBatch(threading.local):
+    """Per-thread state for ModelBase.batch_updates()"""
+    def __init__(self):
+        self.depth = 0
+        self.pending = {}
+        self.flushing = None
+        self.emitted = None
+
+    def defer(self, model, name, signal):
+        key = (id(model), name)
+        if key not in self.pending:
+            self.pending[key] = (model, signal)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        previous = self.flushing, self.emitted
+        self.flushing, self.emitted = pending, set()
+        try:
+            for key, (_, signal) in pending.items():
+                if key not in self.emitted:
+                    self.emitted.add(key)
+                    signal.emit()
+        finally:
+            self.flushing, self.emitted = previous
+
+    def skip_propagated(self, model, name):
+        # While flushing, a propagated change is coalesced with the target's own pending/emitted change
+        if self.emitted is None:
+            return False
+        key = (id(model), name)
+        if key in self.emitted or key in self.flushing:
+            return True
+        self.emitted.add(key)
+        return False
+
+
+_batch = _NotificationBatch()
+
+
+@contextlib.contextmanager
+def _batched():
+    _batch.depth += 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if not _batch.depth and _batch.pending:
+            _batch.flush()
+
+
+class Dispatcher:
+    """
+    Queues work posted from any thread and runs it on the thread which owns the backend's event loop.
+    wake() is called once per batch of posted work and must arrange for flush() to run on that thread.
+
+    Posted property sets and collection appends coalesce while queued: only the latest value posted for a
+    property is applied, and appends to a collection are merged into one extend(). A plain post() is a
+    barrier, anything posted after it is applied after it.
+    """
+    def __init__(self, wake):
+        self._wake = wake
+        self._lock = threading.Lock()
+        self._entries = []  # [callback, args]
+        self._open = {}  # Coalescing key -> entry still accepting merged work
+        self._scheduled = False
+
+    def _enqueue(self, entry, key=None):
+        with self._lock:
+            if key is None:
+                self._open.clear()
+            else:
+                self._open[key] = entry
+            self._entries.append(entry)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._wake()
+
+    def post(self, callback, *args):
+        self._enqueue([callback, args])
+
+    def post_set(self, obj, name, value):
+        key = (id(obj), name)
+        with self._lock:
+            entry = self._open.get(key)
+            if entry is not None:
+                entry[1] = (obj, name, value)
+                return
+        self._enqueue([setattr, (obj, name, value)], key)
+
+    def post_extend(self, collection, items):
+        key = (id(collection), None)
+        with self._lock:
+            entry = self._open.get(key)
+            if entry is not None:
+                entry[1][0].extend(items)
+                return
+        self._enqueue([collection.extend, (list(items),)], key)
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+            self._open.clear()
+            self._scheduled = False
+        with _batched():
+            for i, (callback, args) in enumerate(entries):
+                try:
+                    callback(*args)
+                except BaseException:
+                    with self._lock:
+                        self._entries[:0] = entries[i + 1:]
+                        self._open.clear()  # The requeued entries are now ahead of any open ones
+                        reschedule = bool(self._entries) and not self._scheduled
+                        if reschedule:
+                            self._scheduled = True
+                    if reschedule:
+                        self._wake()
+                    raise
+
+
+class _RateLimitedNotification:
+    """
+    Change notifications of one throttled or debounced property of one model. Throttled ones notify at most
+    once per interval, the first change right away and the last change within an interval once it's over.
+    Debounced ones notify once no change happened for the interval.
+    """
+    __slots__ = ("_model", "_name", "_signal", "_interval", "_debounce", "_last", "_deadline", "_pending",
+                 "_scheduled")
+
+    def __init__(self, model, name, signal, interval, debounce):
+        self._model = weakref.ref(model)
+        self._name = name
+        self._signal = signal
+        self._interval = interval
+        self._debounce = debounce
+        self._last = -math.inf  # When it last notified
+        self._deadline = math.inf  # When a debounced notification is due
+        self._pending = False
+        self._scheduled = False
+
+    def request(self):
+        now = time.monotonic()
+        if self._debounce:
+            self._deadline = now + self._interval
+            if not self._scheduled:
+                self._schedule(self._interval)
+        elif self._scheduled:
+            self._pending = True
+        elif now - self._last >= self._interval:
+            self._emit(now)
+        else:
+            self._pending = True
+            self._schedule(self._last + self._interval - now)
+
+    def cancel(self):
+        self._pending = False
+        self._deadline = math.inf
+
+    def _schedule(self, delay):
+        model = self._model()
+        if model is not None:
+            self._scheduled = True
+            model._timer_wheel.call_later(delay, self._fire)
+
+    def _fire(self):
+        self._scheduled = False
+        now = time.monotonic()
+        if self._debounce:
+            if self._deadline == math.inf:
+                return
+            if now < self._deadline:  # Changed again since it was scheduled
+                self._schedule(self._deadline - now)
+                return
+            self._deadline = math.inf
+            self._emit(now)
+        elif self._pending:
+            self._pending = False
+            self._emit(now)
+
+    def _emit(self, now):
+        self._last = now
+        model = self._model()
+        if model is not None:
+            ModelBaseMixin._emit_property_changed(model, self._name, self._signal)
+
+
+class _WriteListeners:
+    """Callbacks for the writes of a throttled or debounced property, called right away unlike its notifications"""
+    __slots__ = ("_callbacks",)
+
+    def __init__(self):
+        self._callbacks = ()
+
+    def connect(self, callback):
+        self._callbacks += (callback,)
+
+    def disconnect(self, callback):
+        callbacks = list(self._callbacks)
+        callbacks.remove(callback)
+        self._callbacks = tuple(callbacks)
+
+    def emit(self):
+        for callback in self._callbacks:
+            callback()
+
+
+def _write_listeners(model, name):
+    # Connectable like a signal, for what needs every write of a rate limited property, e.g. undo
+    written = model.__dict__.get("_mvvm_written")
+    if written is None:
+        written = model.__dict__["_mvvm_written"] = {}
+    listeners = written.get(name)
+    if listeners is None:
+        listeners = written[name] = _WriteListeners()
+    return listeners
+
+
+def _rate_limited_emit_property_changed(model, name, signal):
+    # The _emit_property_changed() of classes having throttled or debounced properties
+    limiters = model.__dict__.get("_mvvm_rate_limiters")
+    limiter = limiters.get(name) if limiters is not None else None
+    if limiter is None:
+        info = type(model).__mvvm_properties__.get(name)
+        interval = info and (info.throttle_ms or info.debounce_ms)
+        if not interval:
+            ModelBaseMixin._emit_property_changed(model, name, signal)
+            return
+        if limiters is None:
+            limiters = model.__dict__["_mvvm_rate_limiters"] = {}
+            bindings(model).on_dispose(functools.partial(_cancel_rate_limiters, limiters))
+        limiter = _RateLimitedNotification(model, name, signal, interval / 1000, bool(info.debounce_ms))
+        limiters[name] = limiter
+    written = model.__dict__.get("_mvvm_written")
+    if written is not None and name in written:
+        written[name].emit()
+    limiter.request()
+
+
+def _cancel_rate_limiters(limiters):
+    for limiter in limiters.values():
+        limiter.cancel()
+
+
+def _propagate_change(name, target, *args):
+    if not _batch.skip_propagated(target, name):
+        target._notify_property_changed(name)
+
+
+def _call_without_target(callback, target, *args):
+    callback(*args)
+
+
+class ModelBaseMixin:
+    """Property change notification shared by the backends' ModelBase"""
+    def _property_signal(self, name):
+        info = type(self).__mvvm_properties__.get(name)
+        if info is not None and info.signal is not None:
+            return info.signal.__get__(self, type(self))
+        raise AttributeError(f"{self.__class__.__name__} has no property named {name}")
+
+    def _emit_property_changed(self, name, signal):
+        if _batch.depth:
+            _batch.defer(self, name, signal)
+        else:
+            signal.emit()
+
+    def _notify_property_changed(self, name=""):
+        if not name:
+            code = sys._getframe(1).f_code
+            name = _setter_property_names.get(code, code.co_name)
+        self._emit_property_changed(name, self._property_signal(name))
+
+    def _propagate_property_changed(self, source: ModelBaseMixin, source_property_name, target_property_name=None):
+        if not target_property_name:
+            target_property_name = source_property_name
+
+        bindings(self).bind(source, source.on_property_changed(source_property_name),
+                            functools.partial(_propagate_change, target_property_name))
+
+    def bind(self, source, name, callback):
+        """
+        Connects callback to the change of source's property name, or to its Event name. Returns the binding,
+        whose dispose() disconnects it. Bound methods of this model are only held weakly, and the connection is
+        dropped when either side is destroyed or by dispose().
+        """
+        try:
+            signal = source.on_property_changed(name)
+        except AttributeError:
+            signal = getattr(source, name)
+        if getattr(callback, "__self__", None) is self:
+            callback = callback.__func__
+        else:
+            callback = functools.partial(_call_without_target, callback)
+        return bindings(self).bind(source, signal, callback)
+
+    def dispose(self):
+        """
+        Disconnects every connection the library made for this model, cancels its running Commands and
+        drops its computed property values. Called automatically when the model is destroyed.
+        """
+        bindings(self).dispose()
+
+    @contextlib.contextmanager
+    def batch_updates(self):
+        """
+        Holds back property change notifications until the outermost batch exits, then emits each changed
+        property once. Batches are per-thread and span every model changed within them.
+        """
+        with _batched():
+            yield self
+
+    def _command_tasks(self):
+        # Running task of each async Command, by name
+        tasks = self.__dict__.get("_mvvm_command_tasks")
+        if tasks is None:
+            tasks = self.__dict__["_mvvm_command_tasks"] = {}
+            bindings(self).on_dispose(functools.partial(_abandon_tasks, tasks))
+        return tasks
+
+    def cancel_commands(self):
+        """Cancels every running async Command of this model"""
+        _cancel_tasks(self._command_tasks())
+
+    def post(self, callback, *args):
+        """Runs callback(*args) on the GUI thread, callable from any thread"""
+        self._dispatcher.post(callback, *args)
+
+    def post_set(self, name, value):
+        """
+        Sets a property on the GUI thread, callable from any thread.
+        Repeated sets of the same property before the GUI thread gets to them only apply the latest value.
+        """
+        self._dispatcher.post_set(self, name, value)
+
+    def on_property_changed(self, name):
+        return self._property_signal(name)
@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Any, List, Tuple, Union, Callable
+from typing import Generic, TypeVar, Any, List, Tuple, Union, Callable, ContextManager, Iterable, Sequence, \
+    Mapping, NamedTuple, Optional
 
 
 T = TypeVar("T")
 
 
 class ObservableCollection(Generic[T]):
-    def __init__(self, initial_items: List[T] = None):
+    filter_remove_reset_threshold: int = 64
+    filter_remove_reset_ratio: float = 0.05
+
+    def __init__(self, initial_items: List[T] = None, item_type: type = None, dispose_removed: bool = False):
+        """dispose_removed calls dispose() on items once they are no longer in the collection"""
         raise NotImplementedError
 
     def __getitem__(self, item) -> T:
@@ -25,24 +30,70 @@ class ObservableCollection(Generic[T]):
     def items(self) -> List[T]:
         return []
 
+    @property
+    def count(self) -> int:
+        """Number of rows, notifying changes"""
+        pass
+
+    def on_property_changed(self, name: str) -> Event:
+        """Change notification of count, e.g. for Property(depends_on=["items.count"])"""
+        pass
+
     def append(self, item: T):
         pass
 
+    def post_append(self, item: T):
+        """Thread-safe append() applied on the GUI thread, queued appends are merged into one insertion"""
+        pass
+
+    def post_extend(self, items: Iterable[T]):
+        """Thread-safe extend() applied on the GUI thread, queued appends are merged into one insertion"""
+        pass
+
+    def index_of(self, item: T) -> int:
+        pass
+
     def remove(self, item: T):
         pass
 
-    def filter_remove(self, func):
+    def filter_remove(self, func: Callable[[T], bool]) -> List[T]:
+        pass
+
+    def remove_range(self, start: int, count: int) -> List[T]:
         pass
 
     def insert(self, index: int, item: T):
         pass
 
+    def insert_many(self, index: int, items: Iterable[T]):
+        pass
+
     def extend(self, items: Union[List[T], Tuple[T]]):
         pass
 
     def replace(self, index: int, item: T):
         pass
 
+    def replace_range(self, start: int, items: Iterable[T]):
+        pass
+
+    def move(self, src: int, dst: int):
+        pass
+
+    def move_range(self, start: int, count: int, dst: int):
+        pass
+
+    def reset_to(self, new_items: Iterable[T], key: Callable[[T], Any] = None):
+        pass
+
+    def view(self, where: Callable[[T], bool] = None, sort_key: Callable[[T], Any] = None,
+             depends_on: Iterable[str] = ()) -> ObservableCollectionView[T]:
+        pass
+
+    def dispose(self):
+        """Disconnects the collection from its items"""
+        pass
+
     def clear(self):
         pass
 
@@ -50,10 +101,334 @@ class ObservableCollection(Generic[T]):
         pass
 
 
+class ObservableCollectionView(Generic[T]):
+    def __init__(self, source: ObservableCollection[T], where: Callable[[T], bool] = None,
+                 sort_key: Callable[[T], Any] = None, depends_on: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def __getitem__(self, item) -> T:
+        pass
+
+    def __len__(self):
+        pass
+
+    def __contains__(self, item):
+        pass
+
+    def __iter__(self):
+        pass
+
+    @property
+    def items(self) -> List[T]:
+        return []
+
+    @property
+    def count(self) -> int:
+        """Number of rows, notifying changes"""
+        pass
+
+    def on_property_changed(self, name: str) -> Event:
+        """Change notification of count, e.g. for Property(depends_on=["items.count"])"""
+        pass
+
+    @property
+    def source(self) -> ObservableCollection[T]:
+        pass
+
+    def dispose(self):
+        pass
+
+
+class KeyedObservableCollection(ObservableCollection[T]):
+    def __init__(self, initial_items: List[T] = None, key: Callable[[T], Any] = None, item_type: type = None,
+                 dispose_removed: bool = False):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        pass
+
+    def get(self, key, default: T = None) -> T:
+        pass
+
+    def index_of_key(self, key) -> int:
+        pass
+
+    def remove_key(self, key) -> T:
+        pass
+
+    def remove_keys(self, keys: Iterable) -> List[T]:
+        pass
+
+
+class LazyObservableCollection(Generic[T]):
+    def __init__(self, source: Union[Callable[[int, int], Sequence[T]], Iterable[T]], page_size: int = 100,
+                 count: Union[int, Callable[[], int]] = None, max_pages: int = 64, item_type: type = None):
+        raise NotImplementedError
+
+    def __getitem__(self, item) -> T:
+        pass
+
+    def __len__(self):
+        pass
+
+    def __contains__(self, item):
+        pass
+
+    def __iter__(self):
+        pass
+
+    @property
+    def items(self) -> List[T]:
+        return []
+
+    @property
+    def count(self) -> int:
+        """Number of rows, notifying changes"""
+        pass
+
+    def on_property_changed(self, name: str) -> Event:
+        """Change notification of count, e.g. for Property(depends_on=["items.count"])"""
+        pass
+
+    @property
+    def page_size(self) -> int:
+        pass
+
+    @property
+    def resident_pages(self) -> List[int]:
+        pass
+
+    def invalidate(self):
+        pass
+
+
+class ColumnarObservableCollection:
+    def __init__(self, columns: Mapping[str, Any], numpy: bool = False):
+        """
+        columns maps each column's name to an array typecode such as "d" or "i", or with numpy=True to a NumPy
+        dtype. Each column is a role named after it, DisplayRole shows the first column.
+        """
+        raise NotImplementedError
+
+    def __getitem__(self, item) -> Tuple:
+        pass
+
+    def __len__(self):
+        pass
+
+    def __contains__(self, item):
+        pass
+
+    def __iter__(self):
+        pass
+
+    @property
+    def items(self) -> List[Tuple]:
+        return []
+
+    @property
+    def count(self) -> int:
+        """Number of rows, notifying changes"""
+        pass
+
+    def on_property_changed(self, name: str) -> Event:
+        """Change notification of count, e.g. for Property(depends_on=["items.count"])"""
+        pass
+
+    @property
+    def column_names(self) -> List[str]:
+        return []
+
+    def column(self, name: str) -> Sequence:
+        """A read-only memoryview of the column's array.array, or a read-only NumPy view, without copying"""
+        pass
+
+    def value(self, row: int, name: str):
+        pass
+
+    def extend_columns(self, columns: Mapping[str, Sequence] = None, **kwargs: Sequence):
+        """Appends as many rows as each column is given values for, in one insertion"""
+        pass
+
+    def append_row(self, *values, **kwargs):
+        pass
+
+    def update_range(self, start: int, columns: Mapping[str, Sequence] = None, **kwargs: Sequence):
+        """Overwrites the given columns of consecutive rows from start, in one dataChanged"""
+        pass
+
+    def remove_range(self, start: int, count: int):
+        pass
+
+    def clear(self):
+        pass
+
+
+class RingObservableCollection(Generic[T]):
+    def __init__(self, maxlen: int, initial_items: Iterable[T] = None, item_type: type = None,
+                 follow_tail: bool = False):
+        """
+        Keeps the last maxlen items appended, evicting from the front. With follow_tail, appends are added
+        together once the event loop iterates, or on flush().
+        """
+        raise NotImplementedError
+
+    def __getitem__(self, item) -> T:
+        pass
+
+    def __len__(self):
+        pass
+
+    def __contains__(self, item):
+        pass
+
+    def __iter__(self):
+        pass
+
+    @property
+    def items(self) -> List[T]:
+        return []
+
+    @property
+    def count(self) -> int:
+        """Number of rows, notifying changes"""
+        pass
+
+    def on_property_changed(self, name: str) -> Event:
+        """Change notification of count, e.g. for Property(depends_on=["items.count"])"""
+        pass
+
+    @property
+    def maxlen(self) -> int:
+        pass
+
+    @property
+    def follow_tail(self) -> bool:
+        pass
+
+    @follow_tail.setter
+    def follow_tail(self, value: bool):
+        """Turning it off adds the items held back"""
+        pass
+
+    def append(self, item: T):
+        pass
+
+    def extend(self, items: Iterable[T]):
+        """Evictions and insertions are notified once for all the items"""
+        pass
+
+    def flush(self):
+        """Adds the items held back by follow_tail now"""
+        pass
+
+    def clear(self):
+        pass
+
+
+class ObservableTable:
+    def __init__(self, rows: Iterable[Sequence] = None, headers: Sequence[str] = None):
+        """
+        A table model of rows of values. Cell changes are merged into few rectangular dataChanged ranges,
+        notified once the event loop iterates or on flush_changes().
+        """
+        raise NotImplementedError
+
+    def __getitem__(self, cell: Tuple[int, int]):
+        pass
+
+    def __setitem__(self, cell: Tuple[int, int], value):
+        pass
+
+    @property
+    def rows(self) -> List[List]:
+        return []
+
+    @property
+    def row_count(self) -> int:
+        pass
+
+    @property
+    def column_count(self) -> int:
+        pass
+
+    @property
+    def headers(self) -> List[Optional[str]]:
+        return []
+
+    def row(self, index: int) -> List:
+        pass
+
+    def column(self, index: int) -> List:
+        pass
+
+    def cell(self, row: int, column: int):
+        pass
+
+    def set_cell(self, row: int, column: int, value):
+        pass
+
+    def update_cells(self, changes: Iterable[Tuple[int, int, Any]]):
+        """Sets (row, column, value) cells"""
+        pass
+
+    def set_block(self, row: int, column: int, values: Sequence[Sequence]):
+        """Overwrites the cells from (row, column) on with values, a sequence of row sequences"""
+        pass
+
+    def set_header(self, column: int, header: Optional[str]):
+        pass
+
+    def flush_changes(self):
+        """Notifies the pending cell changes now"""
+        pass
+
+    def insert_rows(self, index: int, rows: Iterable[Sequence]):
+        pass
+
+    def append_rows(self, rows: Iterable[Sequence]):
+        pass
+
+    def remove_rows(self, start: int, count: int = 1):
+        pass
+
+    def insert_columns(self, index: int, columns: Iterable[Sequence], headers: Sequence[str] = None):
+        """Inserts columns given as sequences of values, one per row"""
+        pass
+
+    def append_columns(self, columns: Iterable[Sequence], headers: Sequence[str] = None):
+        pass
+
+    def remove_columns(self, start: int, count: int = 1):
+        pass
+
+    def reset(self, rows: Iterable[Sequence] = (), headers: Sequence[str] = None):
+        pass
+
+    def clear(self):
+        pass
+
+
 class Property(property):
-    def __init__(self, type_=None, fget=None, fset=None, fdel=None, doc=None, constant=False):
+    def __init__(self, type_=None, fget=None, fset=None, fdel=None, doc=None, constant=False, field: str = None,
+                 notify: bool = True, depends_on: Sequence[str] = (), throttle_ms: float = None,
+                 debounce_ms: float = None):
+        """
+        depends_on makes a computed property: its value is cached per instance and only recomputed when
+        one of the named properties changes, dotted names following properties of properties
+        (e.g. "items.count"). Changes are only notified if the recomputed value differs.
+
+        throttle_ms notifies changes at most once per interval: the first right away, the last one of an
+        interval once it's over. debounce_ms notifies once no change happened for the interval. Either way
+        the value is stored immediately, and one timer serves every model.
+        """
         self.type = type_
         self.constant = constant
+        self.field = field
+        self.notify = notify
+        self.depends_on = tuple(depends_on)
+        self.throttle_ms = throttle_ms
+        self.debounce_ms = debounce_ms
         super().__init__(fget=fget, fset=fset, fdel=fdel, doc=doc)
 
     def __call__(self, fget=None, fset=None, fdel=None, doc=None):
@@ -61,13 +436,17 @@ class Property(property):
         return self
 
     def getter(self, fget):
-        return self.__class__(self.type, fget, self.fset, self.fdel, self.__doc__)
+        return self._copy(fget, self.fset, self.fdel)
 
     def setter(self, fset):
-        return self.__class__(self.type, self.fget, fset, self.fdel, self.__doc__)
+        return self._copy(self.fget, fset, self.fdel)
 
     def deleter(self, fdel):
-        return self.__class__(self.type, self.fget, self.fset, fdel, self.__doc__)
+        return self._copy(self.fget, self.fset, fdel)
+
+    def _copy(self, fget, fset, fdel):
+        return self.__class__(self.type, fget, fset, fdel, self.__doc__, self.constant, self.field, self.notify,
+                              self.depends_on, self.throttle_ms, self.debounce_ms)
 
 
 class Event(Generic[T]):
@@ -94,26 +473,101 @@ class Event(Generic[T]):
 
 
 class Command:
-    def __init__(self, *types, name: str = None, result: Any = None):
+    """
+    Marks a method as invokable from the view.
+
+    Commands can run in the background, getting <name>_is_running and <name>_can_execute bool properties:
+    - An async def method runs as an asyncio task without blocking the UI.
+    - With executor="thread"/"process" (or a name given to mvvm.set_executor()) the method runs on a shared
+      concurrent.futures pool. It gets the invocation's arguments but not the model.
+    The result is assigned to the target property and passed to on_done(result, error) on the GUI thread,
+    on_done being a method name or a function taking the model first.
+    policy: "restart" supersedes a still running invocation, dropping its result, "drop" ignores invocations
+    while running.
+    """
+    def __init__(self, *types, name: str = None, result: Any = None, policy: str = "restart",
+                 executor: str = None, on_done: Union[str, Callable] = None, target: str = None):
         raise NotImplementedError
 
     def __call__(self, *args, **kwargs):
         pass
 
 
+class PropertyInfo(NamedTuple):
+    """One Property of a model class, see ModelBase.__mvvm_properties__"""
+    name: str
+    type: Any
+    constant: bool
+    signal: Any  # Class level notify signal, signal.__get__(model) gives the model's. None when constant
+    fget: Callable
+    fset: Optional[Callable]
+    role: int  # Role exposing the property in collections with this item_type
+    field: Optional[str] = None  # Backing field
+    depends_on: Tuple[str, ...] = ()  # Dependencies of a computed property
+    throttle_ms: Optional[float] = None  # Notifies at most once per interval
+    debounce_ms: Optional[float] = None  # Notifies once changes paused for the interval
+
+
 class ModelBase:
+    # Every Property of the class, inherited ones included, by name. Read-only, built once per class
+    __mvvm_properties__: Mapping[str, PropertyInfo] = {}
+
     def __init__(self, parent=None):
         raise NotImplementedError
 
     def _notify_property_changed(self, name=""):
         pass
 
-    def _propagate_property_changed(self, source: ModelBase, source_property_name: str, target_property_name: str = None):
+    def _propagate_property_changed(self, source: ModelBase, source_property_name: str,
+                                    target_property_name: str = None):
         pass
 
     def on_property_changed(self, name: str) -> Event:
         pass
 
+    def batch_updates(self) -> ContextManager[ModelBase]:
+        pass
+
+    def bind(self, source: Any, name: str, callback: Callable) -> Any:
+        """
+        Connects callback to the change of source's property name, or to its Event name, returning a binding
+        with a dispose() method. Bound methods of this model are held weakly, the connection goes away when
+        either side is destroyed or on dispose().
+        """
+        pass
+
+    def dispose(self):
+        """
+        Disconnects every connection the library made for this model (bind(), _propagate_property_changed(),
+        computed properties) and cancels its running Commands. Done automatically when it is destroyed.
+        """
+        pass
+
+    def cancel_commands(self):
+        """Cancels the running async Commands, also done when the model is destroyed"""
+        pass
+
+    def post(self, callback: Callable, *args):
+        """Thread-safe, runs callback(*args) on the GUI thread"""
+        pass
+
+    def post_set(self, name: str, value: Any):
+        """Thread-safe property set applied on the GUI thread, only the latest value queued is applied"""
+        pass
+
 
 class ViewModelBase(ModelBase):
-    pass
\ No newline at end of file
+    pass
+
+
+def process_events():
+    """Runs pending deferred work, e.g. coalesced item notifications and cache trimming"""
+    raise NotImplementedError
+
+
+def register_pending_types():
+    """
+    Registers the model types collected so far with QML. Done automatically when a model is created, needed
+    before loading QML which instantiates model types itself.
+    """
+    raise NotImplementedError
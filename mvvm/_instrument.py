@@ -0,0 +1,405 @@
+from __future__ import annotations
+import functools
+import gc
+import threading
+import time
+from typing import Callable, Optional
+from mvvm import _common
+
+# Runtime statistics for mvvm.instrument(). The library's hot paths are only wrapped while an
+# Instrumentation is running, so there is nothing to pay for otherwise.
+
+
+def _class_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+class _PropertyStats:
+    __slots__ = ("key", "emits", "seconds", "listeners", "tick_emits", "max_tick_emits", "storms")
+
+    def __init__(self, key):
+        self.key = key
+        self.emits = 0
+        self.seconds = 0.0
+        self.listeners = 0
+        self.tick_emits = 0
+        self.max_tick_emits = 0
+        self.storms = 0
+
+
+class _TimedSignal:
+    """Stands in for a property's signal held back by batch_updates(), measuring the emit once flushed"""
+    __slots__ = ("_instrumentation", "_model", "_name", "_signal")
+
+    def __init__(self, instrumentation, model, name, signal):
+        self._instrumentation = instrumentation
+        self._model = model
+        self._name = name
+        self._signal = signal
+
+    def emit(self):
+        self._instrumentation._emit_property(self._model, self._name, self._signal)
+
+
+class _SenderTrackingEvent:
+    """
+    Stands in for a class's Event while instrumenting, noting the class of the object each bound event is
+    handed out for, as bound events can't tell which object they belong to. A data descriptor, so it's
+    consulted even once the bound event is cached in the object's __dict__.
+    """
+    __slots__ = ("name", "event", "senders")
+
+    def __init__(self, name, event, senders):
+        self.name = name
+        self.event = event
+        self.senders = senders
+
+    def __get__(self, instance, owner=None):
+        bound = self.event.__get__(instance, owner)
+        if instance is not None:
+            self.senders[id(bound)] = type(instance)
+        return bound
+
+    def __set__(self, instance, value):
+        # What an instance attribute shadowing the event would get, e.g. from event += handler
+        instance.__dict__[self.name] = value
+
+
+def _note_senders(obj, bound_event, senders):
+    # The bound events obj holds in its __dict__. PySide creates all of an object's signals up front and
+    # hands them out from there, without going through the class's attributes.
+    for value in getattr(obj, "__dict__", {}).values():
+        if isinstance(value, bound_event):
+            senders[id(value)] = type(obj)
+
+
+def _column_rows(columns, kwargs):
+    # Rows given to extend_columns()/update_range() as one sequence of values per column
+    columns = dict(columns or {}, **kwargs)
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _table_size(table):
+    return len(table._rows), table._column_count, table._dirty
+
+
+def _dirty_rows(before):
+    if not before[2]:
+        return None
+    return sum(bottom - top + 1 for top, bottom in _common._merge_intervals(
+        (top, bottom) for top, _, bottom, _ in before[2]))
+
+
+# Collection class -> (size taken before each call, {mutation: (reported operation, rows affected given
+# the collection, the call's args and kwargs and the size before, None if nothing changed)}). Column
+# operations of tables count columns rather than rows.
+_COLLECTION_OPERATIONS = {
+    _common.ObservableCollectionMixin: (len, {
+        "_insert_rows": ("insert", lambda c, args, kwargs, before: len(args[1])),
+        "_remove_rows": ("remove", lambda c, args, kwargs, before: args[1] - args[0]),
+        "_remove_runs": ("remove", lambda c, args, kwargs, before: before - len(c)),
+        "_move_rows": ("move", lambda c, args, kwargs, before: max(args[1] - args[0], 0)),
+        "_replace_rows": ("replace", lambda c, args, kwargs, before: len(args[1])),
+        "_reset_rows": ("reset", lambda c, args, kwargs, before: len(args[0])),
+    }),
+    _common.RingObservableCollectionMixin: (len, {
+        "_add": ("insert", lambda c, args, kwargs, before: len(args[0])),
+        "clear": ("reset", lambda c, args, kwargs, before: before),
+    }),
+    _common.ColumnarObservableCollectionMixin: (len, {
+        "extend_columns": ("insert", lambda c, args, kwargs, before: len(c) - before),
+        "update_range": ("update", lambda c, args, kwargs, before: _column_rows(
+            args[1] if len(args) > 1 else kwargs.get("columns"),
+            {name: values for name, values in kwargs.items() if name != "columns"})),
+        "remove_range": ("remove", lambda c, args, kwargs, before: before - len(c)),
+        "clear": ("reset", lambda c, args, kwargs, before: before),
+    }),
+    _common.ObservableTableMixin: (_table_size, {
+        "flush_changes": ("update", lambda c, args, kwargs, before: _dirty_rows(before)),
+        "insert_rows": ("insert", lambda c, args, kwargs, before: len(c._rows) - before[0]),
+        "remove_rows": ("remove", lambda c, args, kwargs, before: before[0] - len(c._rows)),
+        "insert_columns": ("insert_columns", lambda c, args, kwargs, before: c._column_count - before[1]),
+        "remove_columns": ("remove_columns", lambda c, args, kwargs, before: before[1] - c._column_count),
+        "reset": ("reset", lambda c, args, kwargs, before: len(c._rows)),
+    }),
+}
+
+# Marks an attribute _patch() added rather than replaced
+_MISSING = object()
+
+_running = None
+
+
+class Instrumentation:
+    """
+    Counts property change notifications, Event emits, Command invocations and collection mutations
+    while running, see mvvm.instrument(). Times include the connected handlers, which run synchronously.
+
+    A storm is a property notifying more than storm_threshold times within one event loop tick (between
+    two process_events() on the python backend). on_storm(class_name, property_name, emits) is called
+    for each once the tick is over.
+    """
+    def __init__(self, backend, storm_threshold: int = 100,
+                 on_storm: Optional[Callable[[str, str, int], None]] = None):
+        self.storm_threshold = storm_threshold
+        self.on_storm = on_storm
+        self._backend = backend
+        self._patches = []  # (owner, attribute, original), undone by stop()
+        self._sampler = None
+        self._tick_scheduled = False
+        self.reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return _running is self
+
+    def reset(self):
+        """Drops the statistics collected so far"""
+        self._started = time.perf_counter()
+        self._properties = {}  # (model class, property name) -> _PropertyStats
+        self._events = {}  # (sender class, event name) -> [emits, seconds, listeners]
+        self._commands = {}  # (model class, command name) -> [calls, seconds]
+        self._collections = {}  # (collection class, operation) -> [calls, rows, seconds]
+        self._tick = []  # _PropertyStats notified during the current tick
+
+    def start(self):
+        global _running
+        if _running is not None:
+            raise RuntimeError("Instrumentation is already running, stop() it first")
+        _running = self
+        try:
+            self._patch_properties()
+            self._patch_events()
+            self._patch_commands()
+            self._patch_collections()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def stop(self):
+        """Restores the library's unwrapped code, the statistics stay available"""
+        global _running
+        if self._sampler is not None:
+            self._sampler.set()
+            self._sampler = None
+        while self._patches:
+            owner, attribute, original = self._patches.pop()
+            if original is _MISSING:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        if _running is self:
+            _running = None
+
+    def sample(self, interval: float, callback: Callable[[dict], None]):
+        """Calls callback(snapshot()) on the GUI thread every interval seconds until stop()"""
+        if self._sampler is not None:
+            self._sampler.set()
+        stopped = self._sampler = threading.Event()
+        dispatcher = self._backend.ModelBase._dispatcher
+
+        def run():
+            while not stopped.wait(interval):
+                dispatcher.post(self._sample, stopped, callback)
+
+        threading.Thread(target=run, name="mvvm-instrumentation-sampler", daemon=True).start()
+
+    def _sample(self, stopped, callback):
+        if not stopped.is_set():
+            callback(self.snapshot())
+
+    def snapshot(self) -> dict:
+        """The statistics so far as plain, JSON serializable dicts, models and collections by class name"""
+        properties = {}
+        for (cls, name), stats in self._properties.items():
+            properties.setdefault(_class_name(cls), {})[name] = {
+                "emits": stats.emits,
+                "seconds": stats.seconds,
+                "listeners": stats.listeners,
+                "max_emits_per_tick": max(stats.max_tick_emits, stats.tick_emits),
+                "storms": stats.storms,
+            }
+        commands = {}
+        for (cls, name), (calls, seconds) in self._commands.items():
+            commands.setdefault(_class_name(cls), {})[name] = {"calls": calls, "seconds": seconds}
+        events = {}
+        for (cls, name), (emits, seconds, listeners) in self._events.items():
+            # Senders are unknown for Qt signals looked up before instrumenting
+            sender = _class_name(cls) if cls is not None else "unknown"
+            events.setdefault(sender, {})[name] = {"emits": emits, "seconds": seconds, "listeners": listeners}
+        collections = {}
+        for (cls, operation), (calls, rows, seconds) in self._collections.items():
+            stats = {"calls": calls, "rows": rows, "seconds": seconds}
+            collections.setdefault(_class_name(cls), {})[operation] = stats
+        return {
+            "duration": time.perf_counter() - self._started,
+            "properties": properties,
+            "events": events,
+            "commands": commands,
+            "collections": collections,
+        }
+
+    def _patch(self, owner, attribute, replacement):
+        self._patches.append((owner, attribute, owner.__dict__.get(attribute, _MISSING)))
+        setattr(owner, attribute, replacement)
+
+    def _patch_properties(self):
+        instrumentation = self
+
+        def _emit_property_changed(model, name, signal):
+            if _common._batch.depth:
+                _common._batch.defer(model, name, _TimedSignal(instrumentation, model, name, signal))
+            else:
+                instrumentation._emit_property(model, name, signal)
+
+        self._patch(_common.ModelBaseMixin, "_emit_property_changed", _emit_property_changed)
+
+    def _emit_property(self, model, name, signal):
+        key = (type(model), name)
+        stats = self._properties.get(key)
+        if stats is None:
+            stats = self._properties[key] = _PropertyStats(key)
+        if not stats.tick_emits:
+            self._tick.append(stats)
+            if not self._tick_scheduled:
+                self._tick_scheduled = True
+                model._call_soon(self._end_tick)
+        stats.tick_emits += 1
+        stats.emits += 1
+        stats.listeners = model._listener_count(name, signal)
+        start = time.perf_counter()
+        try:
+            self._emit(signal)  # Unwrapped, not to count it as an Event as well
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    def _end_tick(self):
+        self._tick_scheduled = False
+        tick, self._tick = self._tick, []
+        for stats in tick:
+            emits, stats.tick_emits = stats.tick_emits, 0
+            stats.max_tick_emits = max(stats.max_tick_emits, emits)
+            if emits > self.storm_threshold:
+                stats.storms += 1
+                if self.on_storm is not None:
+                    cls, name = stats.key
+                    self.on_storm(_class_name(cls), name, emits)
+
+    def _patch_events(self):
+        bound_event = self._backend.BoundEvent
+        event_info = self._backend.event_info
+        events = self._events
+        senders = {}  # id() of a bound event -> class of the object it belongs to
+        emit = self._emit = bound_event.__dict__["emit"]
+
+        def instrumented_emit(event, *args):
+            name, listeners = event_info(event)
+            sender = senders.get(id(event))
+            start = time.perf_counter()
+            try:
+                return emit(event, *args)
+            finally:
+                key = (sender, name)
+                entry = events.get(key)
+                if entry is None:
+                    entry = events[key] = [0, 0.0, None]
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+                entry[2] = listeners
+
+        self._patch(bound_event, "emit", instrumented_emit)
+        if "raise_event" in bound_event.__dict__ and bound_event.__dict__["raise_event"] is emit:
+            self._patch(bound_event, "raise_event", instrumented_emit)
+
+        # Senders of the bound events existing objects hold, of those created from now on, and of those
+        # handed out from now on. Each class gets its own stand-ins, inherited events included.
+        roots = (_common.ModelBaseMixin, _common.ListModelMixin, _common.ObservableTableMixin)
+        for obj in gc.get_objects():
+            if isinstance(obj, roots):
+                _note_senders(obj, bound_event, senders)
+        event_type = self._backend.Event
+        for cls in _subclasses(*roots):
+            if "__init__" in cls.__dict__:
+                self._patch(cls, "__init__", _init_wrapper(cls.__dict__["__init__"], bound_event, senders))
+            declared = {}
+            for base in reversed(cls.__mro__):
+                declared.update((name, value) for name, value in base.__dict__.items()
+                                if isinstance(value, event_type))
+            for name, event in declared.items():
+                self._patch(cls, name, _SenderTrackingEvent(name, event, senders))
+
+    def _patch_commands(self):
+        for cls in _subclasses(_common.ModelBaseMixin):
+            for name, value in tuple(cls.__dict__.items()):
+                if getattr(value, "_mvvm_command", False):
+                    self._patch(cls, name, self._command_wrapper(name, value))
+
+    def _command_wrapper(self, name, func):
+        commands = self._commands
+
+        @functools.wraps(func)  # Keeps the backend's slot marking
+        def invoke(model, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(model, *args, **kwargs)
+            finally:
+                key = (type(model), name)
+                entry = commands.get(key)
+                if entry is None:
+                    entry = commands[key] = [0, 0.0]
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+        return invoke
+
+    def _patch_collections(self):
+        collections = self._collections
+
+        def wrapper(func, size, operation, count_rows):
+            @functools.wraps(func)
+            def mutate(collection, *args, **kwargs):
+                before = size(collection)
+                start = time.perf_counter()
+                result = func(collection, *args, **kwargs)
+                rows = count_rows(collection, args, kwargs, before)
+                if rows is None:  # Nothing to do
+                    return result
+                key = (type(collection), operation)
+                entry = collections.get(key)
+                if entry is None:
+                    entry = collections[key] = [0, 0, 0.0]
+                entry[0] += 1
+                entry[1] += rows
+                entry[2] += time.perf_counter() - start
+                return result
+            return mutate
+
+        for owner, (size, operations) in _COLLECTION_OPERATIONS.items():
+            for attribute, (operation, count_rows) in operations.items():
+                self._patch(owner, attribute, wrapper(owner.__dict__[attribute], size, operation, count_rows))
+
+
+def _init_wrapper(init, bound_event, senders):
+    @functools.wraps(init)
+    def __init__(obj, *args, **kwargs):
+        init(obj, *args, **kwargs)
+        _note_senders(obj, bound_event, senders)
+    return __init__
+
+
+def _subclasses(*classes):
+    # The classes and all their subclasses, each once
+    result = {}
+    pending = list(classes)
+    while pending:
+        cls = pending.pop()
+        if cls not in result:
+            result[cls] = None
+            pending.extend(cls.__subclasses__())
+    return list(result)
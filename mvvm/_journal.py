@@ -0,0 +1,298 @@
+from __future__ import annotations
+import collections
+import contextlib
+import functools
+import time
+import weakref
+from typing import Callable, Optional
+from mvvm import _common
+
+# Kinds of change recorded, each a tuple starting with its kind:
+_PROPERTY = 0  # (_PROPERTY, model, name, old, new)
+_INSERT = 1  # (_INSERT, collection, index, items)
+_REMOVE = 2  # (_REMOVE, collection, index, items)
+_MOVE = 3  # (_MOVE, collection, start, stop, destination), destination as in _move_rows()
+_REPLACE = 4  # (_REPLACE, collection, start, old_items, new_items)
+_RESET = 5  # (_RESET, collection, old_items, new_items)
+
+
+def _apply(change, undo):
+    kind, target = change[0], change[1]
+    if kind == _PROPERTY:
+        setattr(target, change[2], change[3] if undo else change[4])
+    elif kind == _INSERT or kind == _REMOVE:
+        index, items = change[2], change[3]
+        if (kind == _INSERT) == undo:
+            target._remove_rows(index, index + len(items))
+        else:
+            target._insert_rows(index, list(items))
+    elif kind == _MOVE:
+        start, stop, destination = change[2:]
+        if undo:
+            target._move_rows(destination, destination + stop - start, start)
+        else:
+            target._move_rows(start, stop, destination)
+    elif kind == _REPLACE:
+        target._replace_rows(change[2], list(change[3] if undo else change[4]))
+    else:
+        target._reset_rows(list(change[2] if undo else change[3]))
+
+
+def _merge(last, change):
+    # One change doing what last and then change did, None if they don't combine
+    if last[0] != change[0] or last[1] is not change[1]:
+        return None
+    kind = change[0]
+    if kind == _PROPERTY and last[2] == change[2]:
+        return _PROPERTY, last[1], last[2], last[3], change[4]
+    if kind == _INSERT and last[2] <= change[2] <= last[2] + len(last[3]):
+        at = change[2] - last[2]
+        return _INSERT, last[1], last[2], last[3][:at] + change[3] + last[3][at:]
+    if kind == _REMOVE:
+        if change[2] == last[2]:  # Deleting forwards
+            return _REMOVE, last[1], last[2], last[3] + change[3]
+        if change[2] + len(change[3]) == last[2]:  # Backspacing
+            return _REMOVE, last[1], change[2], change[3] + last[3]
+    return None
+
+
+class _CollectionRecorder:
+    """Records a collection's row changes, as one of its observers, those of one operation as one step"""
+    def __init__(self, journal):
+        self._journal = weakref.ref(journal)
+        self.collection = None
+        self._grouping = False  # Whether the operation running opened a group
+
+    def _record(self, change):
+        journal = self._journal()
+        if journal is not None:
+            if self.collection._operation_depth and not self._grouping and not journal._replaying:
+                self._grouping = True
+                journal._open_group()
+            journal._record(change)
+
+    def _source_operation_ended(self):
+        if self._grouping:
+            self._grouping = False
+            journal = self._journal()
+            if journal is not None:
+                journal._close_group()
+
+    def _source_rows_inserted(self, index, items):
+        self._record((_INSERT, self.collection, index, tuple(items)))
+
+    def _source_rows_removed(self, start, items):
+        self._record((_REMOVE, self.collection, start, tuple(items)))
+
+    def _source_rows_moved(self, start, stop, destination):
+        self._record((_MOVE, self.collection, start, stop, destination))
+
+    def _source_rows_replaced(self, start, old_items, new_items):
+        self._record((_REPLACE, self.collection, start, tuple(old_items), tuple(new_items)))
+
+    def _source_reset(self, old_items, new_items):
+        self._record((_RESET, self.collection, tuple(old_items), tuple(new_items)))
+
+
+def _property_changed(model_ref, name, journal, *args):
+    model = model_ref()
+    if model is not None:
+        journal._property_changed(model, name)
+
+
+class ChangeJournal:
+    """
+    Records the changes made to the models and collections it tracks so they can be undone and redone.
+    Property changes are stored as (model, property, old, new), collection changes as the row ranges
+    changed, never as snapshots.
+
+    Changes made within group() are one undo step, other changes are a step each, a collection method
+    making several row changes (e.g. reset_to() or filter_remove()) counting as one change. Consecutive writes of
+    the same property less than merge_interval seconds apart (None for no limit) are merged into one step,
+    as are consecutive row insertions or removals next to each other within a group. At most max_depth
+    steps are kept. undo() and redo() replay a step in one batch of notifications. Throttled and debounced
+    properties are recorded as they're written, not once they notify.
+
+    Items removed from collections made with dispose_removed=True are disposed, undoing their removal
+    brings back disposed items.
+    """
+    def __init__(self, max_depth: int = 100, merge_interval: Optional[float] = 1.0,
+                 on_changed: Callable[[], None] = None):
+        self.merge_interval = merge_interval
+        self.on_changed = on_changed
+        self._undo = collections.deque(maxlen=max_depth)
+        self._redo = []
+        self._values = weakref.WeakKeyDictionary()  # Tracked model -> {property name: value last seen}
+        self._model_bindings = weakref.WeakKeyDictionary()  # Tracked model -> its property bindings
+        self._recorders = weakref.WeakKeyDictionary()  # Tracked collection -> _CollectionRecorder
+        self._group = None
+        self._group_depth = 0
+        self._replaying = False
+        self._last_time = 0.0  # When the last step was recorded
+
+    @property
+    def max_depth(self) -> int:
+        return self._undo.maxlen
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def track(self, *objects):
+        """Starts recording the writable properties of models, or the row changes of ObservableCollections"""
+        for obj in objects:
+            if isinstance(obj, _common.ObservableCollectionMixin):
+                if obj not in self._recorders:
+                    recorder = self._recorders[obj] = _CollectionRecorder(self)
+                    recorder.collection = obj
+                    obj._observers.append(recorder)
+            elif isinstance(obj, _common.ModelBaseMixin):
+                if obj not in self._values:
+                    self._track_model(obj)
+            else:
+                raise TypeError(f"Can't track {type(obj).__qualname__}, only models and ObservableCollections")
+
+    def _track_model(self, model):
+        values = self._values[model] = {}
+        model_bindings = self._model_bindings[model] = []
+        model_ref = weakref.ref(model)
+        for name, info in type(model).__mvvm_properties__.items():
+            if info.fset is None or info.signal is None or info.depends_on:
+                continue
+            values[name] = info.fget(model)
+            if info.throttle_ms or info.debounce_ms:
+                # Recorded on write, their notifications would come too late to undo the write right away
+                signal = _common._write_listeners(model, name)
+            else:
+                signal = info.signal.__get__(model, type(model))
+            model_bindings.append(_common.bindings(self).bind(model, signal,
+                                                              functools.partial(_property_changed, model_ref, name)))
+
+    def untrack(self, *objects):
+        """Stops recording changes of the objects, the steps already recorded are kept"""
+        for obj in objects:
+            recorder = self._recorders.pop(obj, None)
+            if recorder is not None:
+                obj._observers.remove(recorder)
+            elif self._values.pop(obj, None) is not None:
+                for binding in self._model_bindings.pop(obj):
+                    binding.dispose()
+
+    def dispose(self):
+        """Stops recording and forgets every step"""
+        _common.bindings(self).dispose()
+        for collection, recorder in tuple(self._recorders.items()):
+            collection._observers.remove(recorder)
+        self._recorders.clear()
+        self._values.clear()
+        self._model_bindings.clear()
+        self.clear()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._changed()
+
+    @contextlib.contextmanager
+    def group(self):
+        """Makes the changes within one undo step, groups nest"""
+        self._open_group()
+        try:
+            yield self
+        finally:
+            self._close_group()
+
+    def _open_group(self):
+        if not self._group_depth:
+            self._group = []
+        self._group_depth += 1
+
+    def _close_group(self):
+        self._group_depth -= 1
+        if not self._group_depth:
+            step, self._group = self._group, None
+            if step:
+                self._push(step)
+
+    def undo(self) -> bool:
+        """Reverts the last step, False if there is none"""
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._replay(reversed(step), True)
+        self._redo.append(step)
+        self._changed()
+        return True
+
+    def redo(self) -> bool:
+        """Reapplies the last step undone, False if there is none"""
+        if not self._redo:
+            return False
+        step = self._redo.pop()
+        self._replay(step, False)
+        self._undo.append(step)
+        self._changed()
+        return True
+
+    def _replay(self, step, undo):
+        self._replaying = True
+        try:
+            with _common._batched():
+                for change in step:
+                    if change[0] == _PROPERTY:
+                        # Seen as the current value already, the notification may come once the batch ends
+                        values = self._values.get(change[1])
+                        if values is not None:
+                            values[change[2]] = change[3] if undo else change[4]
+                    _apply(change, undo)
+        finally:
+            self._replaying = False
+
+    def _property_changed(self, model, name):
+        values = self._values.get(model)
+        if values is None:
+            return
+        old, new = values.get(name), getattr(model, name)
+        if old is new or old == new:
+            return
+        values[name] = new
+        self._record((_PROPERTY, model, name, old, new))
+
+    def _record(self, change):
+        if self._replaying:
+            return
+        if self._group is not None:
+            merged = _merge(self._group[-1], change) if self._group else None
+            if merged is not None:
+                self._group[-1] = merged
+            else:
+                self._group.append(change)
+            return
+
+        now = time.monotonic()
+        if change[0] == _PROPERTY and self._undo and not self._redo and len(self._undo[-1]) == 1 and \
+                (self.merge_interval is None or now - self._last_time <= self.merge_interval):
+            merged = _merge(self._undo[-1][0], change)
+            if merged is not None:
+                self._last_time = now
+                if merged[3] is merged[4] or merged[3] == merged[4]:
+                    self._undo.pop()  # Back to where it started
+                else:
+                    self._undo[-1][0] = merged
+                self._changed()
+                return
+        self._push([change])
+
+    def _push(self, step):
+        self._last_time = time.monotonic()
+        self._undo.append(step)
+        self._redo.clear()
+        self._changed()
+
+    def _changed(self):
+        if self.on_changed is not None:
+            self.on_changed()
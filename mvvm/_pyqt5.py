@@ -5,9 +5,36 @@ class ObservableCollection(_qt_common.QtObservableCollectionBase):
     pass
 
 
-Command = _qt_common.QtSlot
+class KeyedObservableCollection(_qt_common.QtKeyedObservableCollectionBase):
+    pass
+
+
+class LazyObservableCollection(_qt_common.QtLazyObservableCollectionBase):
+    pass
+
+
+class ColumnarObservableCollection(_qt_common.QtColumnarObservableCollectionBase):
+    pass
+
+
+class RingObservableCollection(_qt_common.QtRingObservableCollectionBase):
+    pass
+
+
+class ObservableTable(_qt_common.QtObservableTableBase):
+    pass
+
+
+ObservableCollectionView = _qt_common.QtObservableCollectionView
+
+
+Command = _qt_common.QtCommand
 Event = _qt_common.QtSignal
 Property = _qt_common.Property
+process_events = _qt_common.process_events
+register_pending_types = _qt_common.register_pending_types
+BoundEvent = _qt_common.QtBoundSignal
+event_info = _qt_common.event_info
 
 
 class ModelBase(_qt_common.QtModelBase):
@@ -19,4 +46,9 @@ class ViewModelBase(ModelBase):
 
 
 _qt_common.qml_register_type(ObservableCollection)
+_qt_common.qml_register_type(KeyedObservableCollection)
+_qt_common.qml_register_type(LazyObservableCollection)
+_qt_common.qml_register_type(ColumnarObservableCollection)
+_qt_common.qml_register_type(RingObservableCollection)
+_qt_common.qml_register_type(ObservableTable)
 _qt_common.qml_register_type(ModelBase)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+import collections
+import contextlib
+import time
+from mvvm import _common
+
+
+class BoundEvent:
+    """An Event's listeners on one object"""
+    __slots__ = ("_listeners", "_name")
+
+    def __init__(self, name=None):
+        self._name = name
+        self._listeners = ()  # Replaced rather than mutated so emit() can iterate without copying
+
+    def __add__(self, callback) -> BoundEvent:
+        self.connect(callback)
+        return self
+
+    def __sub__(self, callback) -> BoundEvent:
+        self.disconnect(callback)
+        return self
+
+    def __len__(self):
+        return len(self._listeners)
+
+    def __bool__(self):
+        return True
+
+    def emit(self, *args):
+        for callback in self._listeners:
+            callback(*args)
+
+    raise_event = emit
+
+    def connect(self, callback):
+        self._listeners += (callback,)
+
+    def disconnect(self, callback):
+        listeners = list(self._listeners)
+        listeners.remove(callback)
+        self._listeners = tuple(listeners)
+
+
+class Event:
+    """Class level event declaration, each object gets its own BoundEvent on first access"""
+    __slots__ = ("types", "_name")
+
+    def __init__(self, *types):
+        self.types = types
+        self._name = None
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # Normally only reached on first access, afterwards the instance attribute shadows the descriptor
+        bound = instance.__dict__.get(self._name)
+        if bound is None:
+            bound = instance.__dict__[self._name] = BoundEvent(self._name)
+        return bound
+
+
+def event_info(event):
+    # Name and listener count of a BoundEvent, for instrumentation
+    return event._name, len(event._listeners)
+
+
+Command = _common.Command
+Property = _common.Property
+
+
+def _make_property(type_, fget, fset, signal):
+    return property(fget, fset)
+
+
+# Callbacks deferred until the next process_events(), the pure python stand in for an event loop iteration
+_pending_calls = collections.deque()
+
+
+def process_events():
+    while _pending_calls:
+        _pending_calls.popleft()()
+    async_runner.step()
+    timer_wheel.step()
+
+
+# Work posted from other threads runs on whichever thread calls process_events()
+dispatcher = _common.Dispatcher(lambda: _pending_calls.append(dispatcher.flush))
+# async Commands make progress on each process_events()
+async_runner = _common.AsyncRunner(lambda active: None)
+# Throttled and debounced notifications are due on the first process_events() after their deadline
+timer_wheel = _common.TimerWheel(0.001, lambda active: None)
+
+
+def register_pending_types():
+    pass  # No view framework to register types with
+
+
+class ModelMeta(type):
+    def __new__(cls, name, bases, attrs):
+        start = time.perf_counter()
+        _common.build_properties(bases, attrs, Event, _make_property)
+        result = super().__new__(cls, name, bases, attrs)
+        _common.startup_timings.class_created(result, time.perf_counter() - start)
+        return result
+
+
+class ModelBase(_common.ModelBaseMixin, metaclass=ModelMeta):
+    _dispatcher = dispatcher
+    _async_runner = async_runner
+    _timer_wheel = timer_wheel
+
+    def __init__(self, parent=None):
+        self._parent = parent
+
+    def parent(self):
+        return self._parent
+
+    def _call_soon(self, callback):
+        _pending_calls.append(callback)
+
+    def _listener_count(self, name, signal):
+        return len(signal)
+
+
+class ViewModelBase(ModelBase):
+    pass
+
+
+class ListModelBase:
+    """Row change events mirroring Qt's list model signals, destinations follow Qt's beginMoveRows()"""
+    rows_inserted = Event(int, int)
+    rows_removed = Event(int, int)
+    rows_moved = Event(int, int, int)
+    data_changed = Event(int, int, list)
+    model_reset = Event()
+    count_changed = Event()
+    _dispatcher = dispatcher
+
+    @property
+    def count(self):
+        return self.rowCount()
+
+    @contextlib.contextmanager
+    def _insert_context(self, start, end):
+        yield
+        self.rows_inserted.emit(start, end)
+        self.count_changed.emit()
+
+    @contextlib.contextmanager
+    def _remove_context(self, start, end):
+        yield
+        self.rows_removed.emit(start, end)
+        self.count_changed.emit()
+
+    @contextlib.contextmanager
+    def _move_context(self, start, end, destination):
+        yield
+        self.rows_moved.emit(start, end, destination)
+
+    @contextlib.contextmanager
+    def _item_update_context(self, start, end=None):
+        yield
+        self.data_changed.emit(start, start if end is None else end, [])
+
+    @contextlib.contextmanager
+    def _reset_model_context(self):
+        yield
+        self.model_reset.emit()
+        self.count_changed.emit()
+
+    def _emit_data_changed(self, start, end, roles=()):
+        self.data_changed.emit(start, end, list(roles))
+
+    def _call_soon(self, callback):
+        _pending_calls.append(callback)
+
+    def on_property_changed(self, name):
+        if name == "count":
+            return self.count_changed
+        raise AttributeError(f"{self.__class__.__name__} has no property named {name}")
+
+    def rowCount(self, parent=None):
+        return len(self)
+
+
+class ObservableCollection(_common.ObservableCollectionMixin, ListModelBase):
+    pass
+
+
+class KeyedObservableCollection(_common.KeyedObservableCollectionMixin, ObservableCollection):
+    pass
+
+
+class ObservableCollectionView(_common.ObservableCollectionViewMixin, ListModelBase):
+    pass
+
+
+ObservableCollection._view_type = ObservableCollectionView
+
+
+class LazyObservableCollection(_common.LazyObservableCollectionMixin, ListModelBase):
+    pass
+
+
+class ColumnarObservableCollection(_common.ColumnarObservableCollectionMixin, ListModelBase):
+    pass
+
+
+class RingObservableCollection(_common.RingObservableCollectionMixin, ListModelBase):
+    pass
+
+
+class TableModelBase:
+    """Row, column and cell change events mirroring Qt's table model signals"""
+    rows_inserted = Event(int, int)
+    rows_removed = Event(int, int)
+    columns_inserted = Event(int, int)
+    columns_removed = Event(int, int)
+    data_changed = Event(int, int, int, int)  # top, left, bottom, right
+    header_changed = Event(int, int)
+    model_reset = Event()
+    _dispatcher = dispatcher
+
+    @contextlib.contextmanager
+    def _insert_context(self, start, end):
+        yield
+        self.rows_inserted.emit(start, end)
+
+    @contextlib.contextmanager
+    def _remove_context(self, start, end):
+        yield
+        self.rows_removed.emit(start, end)
+
+    @contextlib.contextmanager
+    def _insert_columns_context(self, start, end):
+        yield
+        self.columns_inserted.emit(start, end)
+
+    @contextlib.contextmanager
+    def _remove_columns_context(self, start, end):
+        yield
+        self.columns_removed.emit(start, end)
+
+    @contextlib.contextmanager
+    def _reset_model_context(self):
+        yield
+        self.model_reset.emit()
+
+    def _emit_cells_changed(self, top, left, bottom, right):
+        self.data_changed.emit(top, left, bottom, right)
+
+    def _emit_header_changed(self, first, last):
+        self.header_changed.emit(first, last)
+
+    def _call_soon(self, callback):
+        _pending_calls.append(callback)
+
+    def rowCount(self, parent=None):
+        return len(self._rows)
+
+    def columnCount(self, parent=None):
+        return self._column_count
+
+
+class ObservableTable(_common.ObservableTableMixin, TableModelBase):
+    pass
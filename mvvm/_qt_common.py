@@ -1,7 +1,8 @@
 from __future__ import annotations
 import contextlib
-import inspect
+import time
 import mvvm
+from mvvm import _common
 
 if mvvm.current_framework.startswith("pyside"):
     version = mvvm.current_framework[-1]
@@ -18,6 +19,13 @@ if mvvm.current_framework.startswith("pyside"):
     QtSignal = QtCore.Signal
     QtBoundSignal = QtCore.SignalInstance
     QtSlot = QtCore.Slot
+
+    def signal_name(signal):
+        # Only repr() gives the signature, e.g. "<PySide6.QtCore.SignalInstance countChanged() at 0x...>"
+        return repr(signal).split(" ", 2)[1].split("(", 1)[0]
+
+    def property_listener_count(obj, name, signal):
+        return obj.receivers(f"2_{name}_property_signal()")
 elif mvvm.current_framework.startswith("pyqt"):
     version = mvvm.current_framework[-1]
 
@@ -34,17 +42,37 @@ elif mvvm.current_framework.startswith("pyqt"):
     QtSignal = QtCore.pyqtSignal
     QtBoundSignal = QtCore.pyqtBoundSignal
     QtSlot = QtCore.pyqtSlot
+
+    def signal_name(signal):
+        return signal.signal[1:].split("(", 1)[0]  # signal is the signature, e.g. "2countChanged()"
+
+    def property_listener_count(obj, name, signal):
+        return obj.receivers(signal)
 else:
     raise RuntimeError("Unknown framework trying to use QtCommon")
 
 
-qml_registered_types = []
+qml_registered_types = set()
+# Types waiting for register_pending_types(), a dict to keep them in order
+pending_qml_types = {}
 
 
 def qml_register_type(t):
-    if isinstance(t, type) and issubclass(t, QtCore.QObject) and t not in qml_registered_types:
-        qml_registered_types.append(t)
+    if t not in qml_registered_types and t not in pending_qml_types \
+            and isinstance(t, type) and issubclass(t, QtCore.QObject):
+        pending_qml_types[t] = None
+
+
+def register_pending_types():
+    """Registers the types collected since the last call with QML, called automatically once a model is created"""
+    start = time.perf_counter()
+    while pending_qml_types:
+        t = next(iter(pending_qml_types))
+        del pending_qml_types[t]
+        qml_registered_types.add(t)
         QtQml.qmlRegisterType(t, t.__module__, 1, 0, t.__name__)
+        _common.startup_timings.registered_types += 1
+    _common.startup_timings.type_registration += time.perf_counter() - start
 
 
 def _raise_event(self, *args, **kwargs):
@@ -70,26 +98,83 @@ def add_event_mixins(cls: type):
 add_event_mixins(QtBoundSignal)
 
 
-class QtObservableCollectionBase(QtCore.QAbstractListModel):
-    _MODELDATA_ROLE = model_data_role
-    _DISPLAY_ROLE = display_role
-    _MODELDATA_NAME = QtCore.QByteArray(b"modelData")
+def event_info(signal):
+    # Name and listener count of a bound signal for instrumentation, the count needs the sender
+    return signal_name(signal), None
+
 
-    def __init__(self, initial_items=None):
+class QtDispatcher(QtCore.QObject):
+    """Runs work posted from other threads on the thread this was created in, the GUI thread"""
+    _wake = QtSignal()
+
+    def __init__(self):
         super().__init__()
-        self._items = initial_items or []
+        self.dispatcher = _common.Dispatcher(self._wake.emit)
+        self._wake.connect(self._flush, QtCore.Qt.ConnectionType.QueuedConnection)
 
-    def __getitem__(self, item):
-        return self._items[item]
+    @QtSlot()
+    def _flush(self):
+        self.dispatcher.flush()
+
+
+# Created on import, which is expected to happen on the GUI thread
+qt_dispatcher = QtDispatcher()
+
+
+# How often the asyncio loop running async Commands is stepped while it has tasks
+async_poll_interval_ms = 5
+
+_async_timer = QtCore.QTimer()
+
+
+def _set_async_stepping(active):
+    if active:
+        _async_timer.start(async_poll_interval_ms)
+    else:
+        _async_timer.stop()
+
+
+async_runner = _common.AsyncRunner(_set_async_stepping)
+_async_timer.timeout.connect(async_runner.step)
+
+
+# Granularity of throttled and debounced property notifications, one timer serves every model
+timer_wheel_resolution_ms = 4
+
+_wheel_timer = QtCore.QTimer()
+_wheel_timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+
+
+def _set_wheel_ticking(active):
+    if active:
+        _wheel_timer.start(timer_wheel_resolution_ms)
+    else:
+        _wheel_timer.stop()
+
+
+timer_wheel = _common.TimerWheel(timer_wheel_resolution_ms / 1000, _set_wheel_ticking)
+_wheel_timer.timeout.connect(timer_wheel.step)
+
+
+class QtCommand(_common.Command):
+    def _slot(self, func):
+        kwargs = {}
+        if self.name is not None:
+            kwargs["name"] = self.name
+        if self.result is not None:
+            kwargs["result"] = self.result
+        return QtSlot(*self.types, **kwargs)(func)
 
-    def __len__(self):
-        return len(self._items)
 
-    def __contains__(self, item):
-        return item in self._items
+class QtListModelBase(QtCore.QAbstractListModel):
+    """Qt list model plumbing for the collections and views in _common"""
+    _MODELDATA_ROLE = model_data_role
+    _DISPLAY_ROLE = display_role
+    _MODELDATA_NAME = QtCore.QByteArray(b"modelData")
+    _dispatcher = qt_dispatcher.dispatcher
 
-    def __iter__(self):
-        return self._items
+    countChanged = QtSignal()
+    count = QtProperty(int, fget=lambda self: self.rowCount(), notify=countChanged)
 
     @contextlib.contextmanager
     def _insert_context(self, start, end):
@@ -98,6 +183,7 @@ class QtObservableCollectionBase(QtCore.QAbstractListModel):
             yield
         finally:
             self.endInsertRows()
+            self.countChanged.emit()
 
     @contextlib.contextmanager
     def _remove_context(self, start, end):
@@ -106,14 +192,26 @@ class QtObservableCollectionBase(QtCore.QAbstractListModel):
             yield
         finally:
             self.endRemoveRows()
+            self.countChanged.emit()
+
+    @contextlib.contextmanager
+    def _move_context(self, start, end, destination):
+        # destination is the row index in the list before the move, as Qt expects
+        parent = QtCore.QModelIndex()
+        try:
+            self.beginMoveRows(parent, start, end, parent, destination)
+            yield
+        finally:
+            self.endMoveRows()
 
     @contextlib.contextmanager
-    def _item_update_context(self, index):
-        idx = self.createIndex(index, 0)
+    def _item_update_context(self, start, end=None):
+        top = self.createIndex(start, 0)
+        bottom = top if end is None else self.createIndex(end, 0)
         try:
             yield
         finally:
-            self.dataChanged.emit(idx, idx)
+            self.dataChanged.emit(top, bottom)
 
     @contextlib.contextmanager
     def _reset_model_context(self):
@@ -122,86 +220,206 @@ class QtObservableCollectionBase(QtCore.QAbstractListModel):
             yield
         finally:
             self.endResetModel()
+            self.countChanged.emit()
 
-    @property
-    def items(self):
-        return self._items
+    def _emit_data_changed(self, start, end, roles=()):
+        self.dataChanged.emit(self.createIndex(start, 0), self.createIndex(end, 0), list(roles))
+
+    def _call_soon(self, callback):
+        QtCore.QTimer.singleShot(0, callback)
+
+    def _destroyed_signal(self):
+        return self.destroyed
+
+    def on_property_changed(self, name):
+        if name == "count":
+            return self.countChanged
+        raise AttributeError(f"{self.__class__.__name__} has no property named {name}")
 
     def roleNames(self):
-        return {self._MODELDATA_ROLE: self._MODELDATA_NAME}
+        names = {self._MODELDATA_ROLE: self._MODELDATA_NAME}
+        if self._item_type is not None:
+            names.update((info.role, QtCore.QByteArray(name.encode()))
+                         for name, info in self._item_type.__mvvm_properties__.items())
+        return names
 
     def data(self, index, role=_MODELDATA_ROLE):
-        if role not in [self._DISPLAY_ROLE, self._MODELDATA_ROLE]:
+        getter = self._role_getters.get(role)
+        if getter is None:
             return None
 
         i = index.row()
         if 0 <= i < len(self._items):
-            return self._items[i]
+            return getter(self._items[i])
 
     def rowCount(self, parent=None):
         return len(self._items)
 
-    def append(self, item):
-        size = len(self._items)
-        with self._insert_context(size, size):
-            self._items.append(item)
 
-    def remove(self, item):
-        idx = self._items.index(item)
-        with self._remove_context(idx, idx):
-            self._items.remove(item)
+class QtObservableCollectionBase(_common.ObservableCollectionMixin, QtListModelBase):
+    pass
+
+
+class QtKeyedObservableCollectionBase(_common.KeyedObservableCollectionMixin, QtObservableCollectionBase):
+    pass
+
+
+class QtObservableCollectionView(_common.ObservableCollectionViewMixin, QtListModelBase):
+    pass
+
+
+QtObservableCollectionBase._view_type = QtObservableCollectionView
+
+
+class QtLazyObservableCollectionBase(_common.LazyObservableCollectionMixin, QtListModelBase):
+    def data(self, index, role=QtListModelBase._MODELDATA_ROLE):
+        getter = self._role_getters.get(role)
+        if getter is None:
+            return None
+
+        i = index.row()
+        if 0 <= i < self._row_count:
+            return getter(self[i])
+
+    def rowCount(self, parent=None):
+        return self._row_count
+
+    def canFetchMore(self, parent=None):
+        return self.can_fetch_more()
+
+    def fetchMore(self, parent=None):
+        self.fetch_more()
+
+
+class QtColumnarObservableCollectionBase(_common.ColumnarObservableCollectionMixin, QtListModelBase):
+    def roleNames(self):
+        names = {self._MODELDATA_ROLE: self._MODELDATA_NAME}
+        names.update((role, QtCore.QByteArray(name.encode())) for name, role in self._column_roles.items())
+        return names
+
+    def data(self, index, role=QtListModelBase._MODELDATA_ROLE):
+        return self._role_value(index.row(), role)
+
+    def rowCount(self, parent=None):
+        return self._row_count
+
+
+class QtRingObservableCollectionBase(_common.RingObservableCollectionMixin, QtListModelBase):
+    def data(self, index, role=QtListModelBase._MODELDATA_ROLE):
+        getter = self._role_getters.get(role)
+        if getter is None:
+            return None
+
+        i = index.row()
+        if 0 <= i < self._size:
+            return getter(self._buffer[(self._head + i) % len(self._buffer)])
+
+    def rowCount(self, parent=None):
+        return self._size
+
+
+class QtTableModelBase(QtCore.QAbstractTableModel):
+    """Qt table model plumbing for ObservableTable, the header of a column without one is its number"""
+    _MODELDATA_ROLE = model_data_role
+    _DISPLAY_ROLE = display_role
+    _EDIT_ROLE = QtCore.Qt.ItemDataRole.EditRole
+    _HORIZONTAL = QtCore.Qt.Orientation.Horizontal
+    _ROLE_NAMES = {
+        model_data_role: QtCore.QByteArray(b"modelData"),
+        display_role: QtCore.QByteArray(b"display"),
+        QtCore.Qt.ItemDataRole.EditRole: QtCore.QByteArray(b"edit"),
+    }
+    _dispatcher = qt_dispatcher.dispatcher
+
+    @contextlib.contextmanager
+    def _insert_context(self, start, end):
+        try:
+            self.beginInsertRows(QtCore.QModelIndex(), start, end)
+            yield
+        finally:
+            self.endInsertRows()
+
+    @contextlib.contextmanager
+    def _remove_context(self, start, end):
+        try:
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            yield
+        finally:
+            self.endRemoveRows()
+
+    @contextlib.contextmanager
+    def _insert_columns_context(self, start, end):
+        try:
+            self.beginInsertColumns(QtCore.QModelIndex(), start, end)
+            yield
+        finally:
+            self.endInsertColumns()
+
+    @contextlib.contextmanager
+    def _remove_columns_context(self, start, end):
+        try:
+            self.beginRemoveColumns(QtCore.QModelIndex(), start, end)
+            yield
+        finally:
+            self.endRemoveColumns()
+
+    @contextlib.contextmanager
+    def _reset_model_context(self):
+        try:
+            self.beginResetModel()
+            yield
+        finally:
+            self.endResetModel()
 
-    def filter_remove(self, func):
-        with self._reset_model_context():
-            items_to_remove = list(filter(func, self._items))
-            for item in items_to_remove:
-                self._items.remove(item)
-            return items_to_remove
+    def _emit_cells_changed(self, top, left, bottom, right):
+        self.dataChanged.emit(self.createIndex(top, left), self.createIndex(bottom, right), [])
 
-    def at(self, index):
-        return self._items[index]
+    def _emit_header_changed(self, first, last):
+        self.headerDataChanged.emit(self._HORIZONTAL, first, last)
 
-    def insert(self, index, item):
-        with self._insert_context(index, index):
-            self._items.insert(index, item)
+    def _call_soon(self, callback):
+        QtCore.QTimer.singleShot(0, callback)
 
-    def extend(self, items):
-        start = len(self._items)
-        size = len(items)
-        with self._insert_context(start, start+size-1):
-            self._items.extend(items)
+    def _destroyed_signal(self):
+        return self.destroyed
 
-    def replace(self, index, item):
-        with self._item_update_context(index):
-            self._items[index] = item
+    def roleNames(self):
+        return dict(self._ROLE_NAMES)
+
+    def data(self, index, role=_DISPLAY_ROLE):
+        if role not in self._ROLE_NAMES:
+            return None
+        row, column = index.row(), index.column()
+        if 0 <= row < len(self._rows) and 0 <= column < self._column_count:
+            return self._rows[row][column]
 
-    def clear(self):
-        with self._reset_model_context():
-            self._items = []
+    def setData(self, index, value, role=_EDIT_ROLE):
+        if role not in self._ROLE_NAMES or not index.isValid():
+            return False
+        self.set_cell(index.row(), index.column(), value)
+        return True
 
-    def reverse(self):
-        with self._reset_model_context():
-            self._items.reverse()
+    def flags(self, index):
+        return super().flags(index) | QtCore.Qt.ItemFlag.ItemIsEditable
 
+    def headerData(self, section, orientation, role=_DISPLAY_ROLE):
+        if orientation == self._HORIZONTAL and role == self._DISPLAY_ROLE and 0 <= section < self._column_count:
+            header = self._headers[section]
+            return section + 1 if header is None else header
+        return super().headerData(section, orientation, role)
 
-class Property(property):
-    def __init__(self, type_=None, fget=None, fset=None, fdel=None, doc=None, constant=False):
-        self.type = type_
-        self.constant = constant
-        super().__init__(fget=fget, fset=fset, fdel=fdel, doc=doc)
+    def rowCount(self, parent=None):
+        return len(self._rows)
 
-    def __call__(self, fget=None, fset=None, fdel=None, doc=None):
-        super(Property, self).__init__(fget, fset, fdel, doc)
-        return self
+    def columnCount(self, parent=None):
+        return self._column_count
 
-    def getter(self, fget):
-        return self.__class__(self.type, fget, self.fset, self.fdel, self.__doc__)
 
-    def setter(self, fset):
-        return self.__class__(self.type, self.fget, fset, self.fdel, self.__doc__)
+class QtObservableTableBase(_common.ObservableTableMixin, QtTableModelBase):
+    pass
 
-    def deleter(self, fdel):
-        return self.__class__(self.type, self.fget, self.fset, fdel, self.__doc__)
+
+Property = _common.Property
 
 
 class QtModelMeta(type(QtCore.QObject)):
@@ -212,57 +430,54 @@ class QtModelMeta(type(QtCore.QObject)):
             result = any(getattr(b, "_qml_register_type", False) for b in bases)
         return result
 
+    @staticmethod
+    def _make_property(type_, fget, fset, signal):
+        if signal is None:
+            return QtProperty(type_, fget=fget, fset=fset, constant=True)
+        return QtProperty(type_, fget=fget, fset=fset, notify=signal)
+
     def __new__(cls, name, bases, attrs):
+        start = time.perf_counter()
         should_register_type = cls._should_register_type(attrs, bases)
+        _common.build_properties(bases, attrs, QtSignal, cls._make_property,
+                                 qml_register_type if should_register_type else None)
+        result = super().__new__(cls, name, bases, attrs)
+        if should_register_type:
+            qml_register_type(result)
+        _common.startup_timings.class_created(result, time.perf_counter() - start)
+        return result
 
-        for key in tuple(attrs.keys()):
-            value = attrs[key]
-            if isinstance(value, Property):
-                if value.constant:
-                    attrs[key] = QtProperty(value.type, fget=value.fget, fset=value.fset, constant=True)
-                else:
-                    signal = QtSignal()
-                    signal_name = f"_{key}_property_signal"
-                    attrs[signal_name] = signal
-                    attrs[key] = QtProperty(value.type, fget=value.fget, fset=value.fset, notify=signal)
-                if should_register_type:
-                    qml_register_type(value.type)
-        return super().__new__(cls, name, bases, attrs)
-
-    def __init__(cls, name, bases, dct):
-        super(QtModelMeta, cls).__init__(name, bases, dct)
-        if cls._should_register_type(dct, bases):
-            qml_register_type(cls)
-
-
-class QtModelBase(QtCore.QObject, metaclass=QtModelMeta):
+
+class QtModelBase(_common.ModelBaseMixin, QtCore.QObject, metaclass=QtModelMeta):
     _qml_register_type = False
+    _dispatcher = qt_dispatcher.dispatcher
+    _async_runner = async_runner
+    _timer_wheel = timer_wheel
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        if pending_qml_types:
+            register_pending_types()
 
-    def __get_signal(self, name) -> QtCore.pyqtBoundSignal:
-        signal = getattr(self, f"_{name}_property_signal", None)
-        if signal:
-            return signal
-        raise AttributeError(f"{self.__class__.__name__} has no property named {name}")
+    def _destroyed_signal(self):
+        return self.destroyed
 
-    def _notify_property_changed(self, name=""):
-        if not name:
-            name = inspect.stack()[1][3]
-        self.__get_signal(name).emit()
+    def _call_soon(self, callback):
+        QtCore.QTimer.singleShot(0, callback)
 
-    def _propagate_property_changed(self, source: QtModelBase, source_property_name, target_property_name=None):
-        if not target_property_name:
-            target_property_name = source_property_name
+    def _listener_count(self, name, signal):
+        return property_listener_count(self, name, signal)
 
-        def handler(*args, **kwargs):
-            self._notify_property_changed(target_property_name)
-        source.on_property_changed(source_property_name).connect(handler)
 
-    def on_property_changed(self, name):
-        return self.__get_signal(name)
+def process_events():
+    QtCore.QCoreApplication.processEvents()
 
 
 qml_register_type(QtCore.QAbstractListModel)
 qml_register_type(QtObservableCollectionBase)
+qml_register_type(QtKeyedObservableCollectionBase)
+qml_register_type(QtObservableCollectionView)
+qml_register_type(QtLazyObservableCollectionBase)
+qml_register_type(QtColumnarObservableCollectionBase)
+qml_register_type(QtRingObservableCollectionBase)
+qml_register_type(QtObservableTableBase)
@@ -0,0 +1,668 @@
+from __future__ import annotations
+import base64
+import inspect
+import io
+import json
+import math
+import operator
+import re
+import struct
+import uuid
+from typing import Any, Union
+from mvvm import _common
+
+# Saving and restoring model trees, see mvvm.dump() and mvvm.load(). Each model class gets a schema
+# compiled from its __mvvm_properties__ on first use. Objects are written straight to the output and
+# built straight from the input, without an intermediate tree of dicts.
+
+TYPE_KEY = "__type__"
+BINARY_MAGIC = b"MVVM\x01"
+FORMATS = ("json", "binary")
+
+# Output is handed to the file once this many parts (JSON) or bytes (binary) are buffered
+_JSON_FLUSH_PARTS = 4096
+_BINARY_FLUSH_BYTES = 1 << 16
+# Binary input is read from files in chunks of at least this many bytes
+_BINARY_READ_BYTES = 1 << 16
+
+_SCALAR_TYPES = (bool, int, float, str, bytes, uuid.UUID)
+
+_classes = {}  # "module.qualname" -> model or collection class, for resolving the names stored
+
+
+def _class_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _find_class(name):
+    # Only the library's classes can be named, loading never imports or instantiates anything else
+    cls = _classes.get(name)
+    if cls is None:
+        pending = [_common.ModelBaseMixin, _common.ObservableCollectionMixin]
+        while pending:
+            subclass = pending.pop()
+            pending.extend(subclass.__subclasses__())
+            _classes[_class_name(subclass)] = subclass
+        cls = _classes.get(name)
+        if cls is None:
+            raise ValueError(f"Unknown model class '{name}', its module must be imported before loading")
+    return cls
+
+
+def _is_collection_type(t):
+    return isinstance(t, type) and issubclass(t, _common.ObservableCollectionMixin)
+
+
+def _is_model_type(t):
+    return isinstance(t, type) and issubclass(t, _common.ModelBaseMixin)
+
+
+class _Rows(list):
+    """A collection's items read from the binary format, with the collection's class"""
+    __slots__ = ("cls",)
+
+
+class _Field:
+    """How one Property is read from a model and restored into one"""
+    __slots__ = ("name", "type", "scalar", "get", "attr", "fset")
+
+    def __init__(self, info):
+        self.name = info.name
+        self.type = info.type
+        self.scalar = info.type if info.type in _SCALAR_TYPES else None
+        self.get = operator.attrgetter(info.field) if info.field else info.fget
+        self.attr = info.field
+        self.fset = info.fset
+
+    def restore(self, obj, value, fresh):
+        if self.scalar is None and isinstance(value, list):
+            # Collections are refilled in place, views and bindings of the model keep working
+            current = self.get(obj)
+            if isinstance(current, _common.ObservableCollectionMixin):
+                current._reset_rows(list(value))
+                return
+            if isinstance(value, _Rows):
+                value = value.cls(list(value))
+            elif _is_collection_type(self.type):
+                value = self.type(value)
+        if self.attr is not None and (fresh or self.fset is None):
+            setattr(obj, self.attr, value)  # Nothing can be listening to a model still being built
+        elif self.fset is not None:
+            self.fset(obj, value)
+
+
+class _Schema:
+    """The restorable Properties of a model class"""
+    def __init__(self, cls):
+        self.cls = cls
+        self.name = _class_name(cls)
+        # Computed properties are derived from the others, read-only ones can only be refilled if collections
+        self.fields = tuple(_Field(info) for info in cls.__mvvm_properties__.values()
+                            if not info.depends_on and (info.field or info.fset or _is_collection_type(info.type)))
+        self.by_name = {field.name: field for field in self.fields}
+        self.flat = all(field.scalar for field in self.fields)
+        self.json_tag = f"{{{json.encoder.encode_basestring(TYPE_KEY)}:{json.encoder.encode_basestring(self.name)}"
+        keys = [f"{json.encoder.encode_basestring(field.name)}:" for field in self.fields]
+        self.json_fields = tuple(("," + key, field) for key, field in zip(keys, self.fields))
+        # Without the tag the first field opens the object
+        self.json_fields_untagged = tuple((("{" if i == 0 else ",") + key, field)
+                                          for i, (key, field) in enumerate(zip(keys, self.fields)))
+        self.json_conversions = tuple((field.name, _FROM_JSON[field.scalar]) for field in self.fields
+                                      if field.scalar in _FROM_JSON)
+        self.init_names = self._required_init_parameters(cls)
+
+    @staticmethod
+    def _required_init_parameters(cls):
+        # Properties passed to __init__ because it can't be called without them, e.g. TodoItem(text)
+        try:
+            parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+        except (TypeError, ValueError):
+            return ()
+        return tuple(p.name for p in parameters if p.default is p.empty and
+                     p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY))
+
+    def build(self, values, into=None):
+        if into is None:
+            try:
+                obj = self.cls(**{name: values.pop(name) for name in self.init_names})
+            except KeyError as e:
+                raise TypeError(f"Can't create {self.name}, its __init__ needs {e}, which wasn't stored"
+                                ) from None
+            # Values already computed from the constructor's state have to hear about the changes
+            fresh = "_mvvm_computed" not in obj.__dict__
+        else:
+            obj, fresh = into, False
+        by_name = self.by_name
+        for name, value in values.items():
+            field = by_name.get(name)
+            if field is not None:
+                field.restore(obj, value, fresh)
+        return obj
+
+
+_schemas = {}
+
+
+def _schema(cls):
+    schema = _schemas.get(cls)
+    if schema is None:
+        schema = _schemas[cls] = _Schema(cls)
+    return schema
+
+
+def _json_float(value):
+    if math.isfinite(value):
+        return float.__repr__(value)
+    return "NaN" if value != value else "Infinity" if value > 0 else "-Infinity"
+
+
+_TO_JSON = {
+    type(None): lambda value: "null",
+    bool: lambda value: "true" if value else "false",
+    int: int.__repr__,
+    float: _json_float,
+    str: json.encoder.encode_basestring,
+    bytes: lambda value: f'"{base64.b64encode(value).decode("ascii")}"',
+    uuid.UUID: lambda value: f'"{value}"',
+}
+
+# Declared property types stored as JSON strings
+_FROM_JSON = {
+    bytes: base64.b64decode,
+    uuid.UUID: uuid.UUID,
+}
+
+
+class _JsonWriter:
+    def __init__(self, fp):
+        self.fp = fp
+        self.out = []
+
+    def flush(self):
+        self.fp.write("".join(self.out))
+        self.out.clear()
+
+    def value(self, value, expected=None):
+        to_json = _TO_JSON.get(type(value))
+        if to_json is not None:
+            self.out.append(to_json(value))
+        elif isinstance(value, _common.ModelBaseMixin):
+            self.model(value, type(value) is not expected)
+        elif isinstance(value, _common.ObservableCollectionMixin):
+            self.array(value._items)
+        elif isinstance(value, (list, tuple)):
+            self.array(value)
+        elif isinstance(value, dict):
+            self.object(value)
+        else:
+            raise TypeError(f"Can't serialize {type(value).__qualname__} values")
+
+    def model(self, obj, tagged=True):
+        # The class is named unless it's the property's declared type
+        schema = _schema(type(obj))
+        out = self.out
+        if tagged:
+            out.append(schema.json_tag)
+            fields = schema.json_fields
+        elif schema.fields:
+            fields = schema.json_fields_untagged
+        else:
+            out.append("{")
+            fields = ()
+        for key, field in fields:
+            out.append(key)
+            value = field.get(obj)
+            if type(value) is field.scalar:
+                out.append(_TO_JSON[field.scalar](value))
+            else:
+                self.value(value, field.type)
+        out.append("}")
+
+    def array(self, items):
+        out = self.out
+        out.append("[")
+        for i, item in enumerate(items):
+            if i:
+                out.append(",")
+            self.value(item)
+            if len(out) > _JSON_FLUSH_PARTS:
+                self.flush()
+        out.append("]")
+
+    def object(self, mapping):
+        out = self.out
+        out.append("{")
+        for i, (key, value) in enumerate(mapping.items()):
+            if not isinstance(key, str):
+                raise TypeError(f"Can't serialize dicts with {type(key).__qualname__} keys")
+            out.append(f"{',' if i else ''}{json.encoder.encode_basestring(key)}:")
+            self.value(value)
+        out.append("}")
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_TYPE_TAG = re.compile(r'\{[ \t\n\r]*"__type__"[ \t\n\r]*:[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*')
+_scan_once = json.scanner.make_scanner(json.JSONDecoder())
+
+
+class _JsonReader:
+    """Walks the structure of the document, leaving scalars and flat models to the json module's scanner"""
+    def __init__(self, text):
+        self.text = text
+
+    def scan(self, i):
+        try:
+            return _scan_once(self.text, i)
+        except StopIteration as e:
+            raise json.JSONDecodeError("Expecting value", self.text, e.value) from None
+
+    def expect(self, i, chars):
+        i = _WHITESPACE.match(self.text, i).end()
+        c = self.text[i:i + 1]
+        if not c or c not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise json.JSONDecodeError(f"Expecting {expected}", self.text, i)
+        return c, i + 1
+
+    def value(self, i, expected=None, into=None):
+        text = self.text
+        i = _WHITESPACE.match(text, i).end()
+        c = text[i:i + 1]
+        if c == "{":
+            tag = _TYPE_TAG.match(text, i)
+            if tag is not None:
+                cls = _find_class(tag.group(1))
+                if into is not None and not isinstance(into, cls):
+                    raise TypeError(f"Can't load a {cls.__qualname__} into a {type(into).__qualname__}")
+            elif into is not None:
+                cls = type(into)
+            elif _is_model_type(expected):
+                cls = expected
+            else:
+                return self.object(i)
+            return self.model(_schema(cls), i, tag, into)
+        if c == "[":
+            return self.array(i)
+        return self.scan(i)
+
+    def model(self, schema, i, tag, into):
+        if schema.flat:
+            values, i = self.scan(i)
+            values.pop(TYPE_KEY, None)
+            for name, convert in schema.json_conversions:
+                value = values.get(name)
+                if value is not None:
+                    values[name] = convert(value)
+            return schema.build(values, into), i
+
+        values = {}
+        c, i = self.expect(tag.end() if tag is not None else i + 1, ",}" if tag is not None else '"}')
+        if c == '"':
+            i -= 1
+        while c != "}":
+            key, i = self.scan(_WHITESPACE.match(self.text, i).end())
+            _, i = self.expect(i, ":")
+            field = schema.by_name.get(key)
+            if field is None:
+                _, i = self.value(i)
+            elif field.scalar is not None:
+                value, i = self.scan(_WHITESPACE.match(self.text, i).end())
+                convert = _FROM_JSON.get(field.scalar)
+                values[key] = convert(value) if convert is not None and value is not None else value
+            else:
+                values[key], i = self.value(i, field.type)
+            c, i = self.expect(i, ",}")
+        return schema.build(values, into), i
+
+    def array(self, i):
+        items = []
+        i = _WHITESPACE.match(self.text, i + 1).end()
+        if self.text.startswith("]", i):
+            return items, i + 1
+        c = ","
+        while c != "]":
+            item, i = self.value(i)
+            items.append(item)
+            c, i = self.expect(i, ",]")
+        return items, i
+
+    def object(self, i):
+        result = {}
+        c, i = self.expect(i + 1, '"}')
+        if c == '"':
+            i -= 1
+        while c != "}":
+            key, i = self.scan(_WHITESPACE.match(self.text, i).end())
+            _, i = self.expect(i, ":")
+            result[key], i = self.value(i)
+            c, i = self.expect(i, ",}")
+        return result, i
+
+
+# Binary format: BINARY_MAGIC followed by one tagged value. Integers and lengths are varints, a model is
+# its class followed by its values in the order listed by the class. A class is given by its number in
+# order of first appearance, the first appearance being followed by its name and property names.
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _UUID, _LIST, _DICT, _MODEL, _COLLECTION = range(12)
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+class _BinaryWriter:
+    def __init__(self, fp):
+        self.fp = fp
+        self.out = bytearray(BINARY_MAGIC)
+        self.class_numbers = {}
+
+    def flush(self):
+        self.fp.write(self.out)
+        self.out.clear()
+
+    def value(self, value):
+        write = _BINARY_WRITERS.get(type(value))
+        if write is not None:
+            write(self.out, value)
+        elif isinstance(value, _common.ModelBaseMixin):
+            self.model(value)
+        elif isinstance(value, _common.ObservableCollectionMixin):
+            self.out.append(_COLLECTION)
+            self.class_ref(type(value), ())
+            self.items(value._items)
+        elif isinstance(value, (list, tuple)):
+            self.out.append(_LIST)
+            self.items(value)
+        elif isinstance(value, dict):
+            self.out.append(_DICT)
+            _write_varint(self.out, len(value))
+            for key, item in value.items():
+                self.value(key)
+                self.value(item)
+        else:
+            raise TypeError(f"Can't serialize {type(value).__qualname__} values")
+
+    def class_ref(self, cls, fields):
+        number = self.class_numbers.get(cls)
+        if number is not None:
+            _write_varint(self.out, number)
+            return
+        number = self.class_numbers[cls] = len(self.class_numbers)
+        _write_varint(self.out, number)
+        _write_str(self.out, _class_name(cls))
+        _write_varint(self.out, len(fields))
+        for field in fields:
+            _write_str(self.out, field.name)
+
+    def model(self, obj):
+        schema = _schema(type(obj))
+        self.out.append(_MODEL)
+        self.class_ref(schema.cls, schema.fields)
+        writers = _BINARY_WRITERS
+        for field in schema.fields:
+            value = field.get(obj)
+            write = writers.get(type(value))
+            if write is not None:
+                write(self.out, value)
+            else:
+                self.value(value)
+
+    def items(self, items):
+        _write_varint(self.out, len(items))
+        for item in items:
+            self.value(item)
+            if len(self.out) > _BINARY_FLUSH_BYTES:
+                self.flush()
+
+
+def _write_str(out, value):
+    data = value.encode()
+    _write_varint(out, len(data))
+    out += data
+
+
+def _write_int(out, value):
+    out.append(_INT)
+    _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _write_float(out, value):
+    out.append(_FLOAT)
+    out += _DOUBLE.pack(value)
+
+
+def _write_tagged_str(out, value):
+    out.append(_STR)
+    _write_str(out, value)
+
+
+def _write_bytes(out, value):
+    out.append(_BYTES)
+    _write_varint(out, len(value))
+    out += value
+
+
+def _write_uuid(out, value):
+    out.append(_UUID)
+    out += value.bytes
+
+
+_BINARY_WRITERS = {
+    type(None): lambda out, value: out.append(_NONE),
+    bool: lambda out, value: out.append(_TRUE if value else _FALSE),
+    int: _write_int,
+    float: _write_float,
+    str: _write_tagged_str,
+    bytes: _write_bytes,
+    uuid.UUID: _write_uuid,
+}
+
+
+class _BinaryReader:
+    def __init__(self, data):
+        self.data = data
+        self.i = len(BINARY_MAGIC)
+        self.classes = []  # (class, property names) by number
+
+    def varint(self):
+        data, i = self.data, self.i
+        result = shift = 0
+        while True:
+            byte = data[i]
+            i += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.i = i
+                return result
+            shift += 7
+
+    def raw(self, length):
+        start = self.i
+        self.i += length
+        if self.i > len(self.data):
+            raise IndexError  # Truncated
+        return self.data[start:self.i]
+
+    def read_str(self):
+        return self.raw(self.varint()).decode()
+
+    def class_ref(self):
+        number = self.varint()
+        if number == len(self.classes):
+            cls = _find_class(self.read_str())
+            self.classes.append((cls, tuple(self.read_str() for _ in range(self.varint()))))
+        return self.classes[number]
+
+    def value(self):
+        tag = self.data[self.i]
+        self.i += 1
+        return _BINARY_READERS[tag](self)
+
+    def root(self, into=None):
+        try:
+            if into is None:
+                return self.value()
+            if self.data[self.i] != _MODEL:
+                raise TypeError(f"Can't load a value other than a model into a {type(into).__qualname__}")
+            self.i += 1
+            return self.model(into)
+        except IndexError:
+            raise ValueError("Truncated mvvm binary data") from None
+
+    def at_end(self):
+        return self.i == len(self.data)
+
+    def model(self, into=None):
+        cls, names = self.class_ref()
+        if into is not None and not isinstance(into, cls):
+            raise TypeError(f"Can't load a {cls.__qualname__} into a {type(into).__qualname__}")
+        values = {name: self.value() for name in names}
+        return _schema(cls).build(values, into)
+
+    def collection(self):
+        cls, _ = self.class_ref()
+        rows = _Rows(self.value() for _ in range(self.varint()))
+        rows.cls = cls
+        return rows
+
+    def read_int(self):
+        n = self.varint()
+        return -((n + 1) >> 1) if n & 1 else n >> 1
+
+
+class _BinaryFileReader(_BinaryReader):
+    """Reads the binary format from a file as it goes, keeping only the unread part of a chunk"""
+
+    def __init__(self, fp, head):
+        super().__init__(head)
+        self.fp = fp
+        self.eof = False
+
+    def fill(self, length):
+        # Makes length bytes available from self.i, fewer once the file is exhausted
+        if len(self.data) - self.i >= length or self.eof:
+            return
+        parts = [self.data[self.i:]]
+        available = len(parts[0])
+        while available < length:
+            chunk = self.fp.read(max(length - available, _BINARY_READ_BYTES))
+            if not chunk:
+                self.eof = True
+                break
+            parts.append(chunk)
+            available += len(chunk)
+        self.data = b"".join(parts)
+        self.i = 0
+
+    def varint(self):
+        length = 10  # Any 64 bit integer
+        while True:
+            self.fill(length)
+            try:
+                return super().varint()
+            except IndexError:
+                if self.eof:
+                    raise
+                length *= 2
+
+    def raw(self, length):
+        self.fill(length)
+        return super().raw(length)
+
+    def value(self):
+        self.fill(1)
+        return super().value()
+
+    def root(self, into=None):
+        self.fill(1)
+        return super().root(into)
+
+    def at_end(self):
+        self.fill(1)
+        return self.i == len(self.data)
+
+
+_BINARY_READERS = [
+    lambda reader: None,
+    lambda reader: False,
+    lambda reader: True,
+    _BinaryReader.read_int,
+    lambda reader: _DOUBLE.unpack(reader.raw(8))[0],
+    _BinaryReader.read_str,
+    lambda reader: reader.raw(reader.varint()),
+    lambda reader: uuid.UUID(bytes=reader.raw(16)),
+    lambda reader: [reader.value() for _ in range(reader.varint())],
+    lambda reader: {reader.value(): reader.value() for _ in range(reader.varint())},
+    _BinaryReader.model,
+    _BinaryReader.collection,
+]
+
+
+def dump(value: Any, fp, format: str = "json"):
+    """
+    Writes a model, with the models and collections it holds, to fp: a text file for format="json", a binary
+    file for the compact format="binary". Every Property with a backing field or setter is stored, along
+    with collections held by read-only properties. Values can also be plain scalars, UUIDs, bytes, lists and
+    dicts. Output is written as it is produced.
+    """
+    if format == "json":
+        writer = _JsonWriter(fp)
+    elif format == "binary":
+        writer = _BinaryWriter(fp)
+    else:
+        raise ValueError(f"Unknown format '{format}'. Supported formats: {', '.join(FORMATS)}")
+    writer.value(value)
+    writer.flush()
+
+
+def dumps(value: Any, format: str = "json") -> Union[str, bytes]:
+    """dump() to a str for format="json", bytes for format="binary\""""
+    fp = io.StringIO() if format == "json" else io.BytesIO()
+    dump(value, fp, format)
+    return fp.getvalue()
+
+
+def loads(data: Union[str, bytes], into=None) -> Any:
+    """
+    Reads what dump() wrote, in either format. Models are created with the stored properties their __init__
+    requires, the others are then set. With into, the stored model's properties are set on that model
+    instead. Change notifications are held back until everything is loaded, collections the models
+    already hold are refilled in place.
+    """
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(data)
+    if isinstance(data, bytes) and data.startswith(BINARY_MAGIC):
+        return _load_binary(_BinaryReader(data), into)
+    with _common._batched():
+        if isinstance(data, bytes):
+            data = data.decode()
+        reader = _JsonReader(data)
+        value, i = reader.value(0, into=into)
+        if into is not None and value is not into:
+            raise TypeError(f"Can't load a value other than a model into a {type(into).__qualname__}")
+        i = _WHITESPACE.match(data, i).end()
+        if i != len(data):
+            raise json.JSONDecodeError("Extra data", data, i)
+        return value
+
+
+def _load_binary(reader, into):
+    with _common._batched():
+        value = reader.root(into)
+        if not reader.at_end():
+            raise ValueError("Extra data after the mvvm binary value")
+        return value
+
+
+def load(fp, into=None) -> Any:
+    """
+    loads() from a file, text or binary. The binary format is read in chunks as it is decoded, JSON is read
+    whole first as the json module's scanner works on complete strings.
+    """
+    head = fp.read(len(BINARY_MAGIC))
+    if head == BINARY_MAGIC:
+        return _load_binary(_BinaryFileReader(fp, head), into)
+    return loads(head + fp.read(), into)
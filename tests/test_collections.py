@@ -0,0 +1,199 @@
+import random
+
+import pytest
+
+import mvvm
+
+mvvm.use("python")
+
+
+class Item:
+    def __init__(self, key, value=0):
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        return f"Item({self.key!r}, {self.value!r})"
+
+
+def _check_index(collection):
+    # The key index agrees with the items
+    items = list(collection)
+    assert len({item.key for item in items}) == len(items)
+    for row, item in enumerate(items):
+        assert item.key in collection
+        assert collection.get(item.key) is item
+        assert collection.index_of_key(item.key) == row
+        assert collection.index_of(item) == row
+
+
+@pytest.mark.parametrize("change", [
+    lambda c: c.reset_to([Item(1), Item(4), Item(4)]),
+    lambda c: c.extend([Item(2)]),
+    lambda c: c.insert_many(0, [Item(5), Item(5)]),
+])
+def test_rejected_duplicate_keys_leave_the_collection_and_its_index_unchanged(change):
+    items = [Item(1), Item(2), Item(3)]
+    collection = mvvm.KeyedObservableCollection(list(items), key=lambda item: item.key)
+    with pytest.raises(ValueError):
+        change(collection)
+    assert list(collection) == items
+    _check_index(collection)
+    assert collection.remove_key(1) is items[0]
+    _check_index(collection)
+
+
+def test_columnar_column_is_a_read_only_view():
+    collection = mvvm.ColumnarObservableCollection({"x": "d", "n": "i"})
+    collection.extend_columns(x=[1.0, 2.0, 3.0], n=[1, 2, 3])
+    x = collection.column("x")
+    with pytest.raises(TypeError):
+        x[0] = 5.0
+    collection.extend_columns(x=[4.0], n=[4])  # Resizing while the view is held
+    collection.remove_range(0, 1)
+    assert list(x) == [1.0, 2.0, 3.0]
+    assert list(collection.column("x")) == [2.0, 3.0, 4.0]
+    assert [collection.value(row, "n") for row in range(len(collection))] == [2, 3, 4]
+    collection.update_range(0, x=[7.0])
+    assert collection.column("x")[0] == 7.0
+
+
+@pytest.mark.parametrize("keyed", [False, True])
+def test_filter_remove_matches_a_list_and_notifies_each_run(keyed):
+    rng = random.Random(3)
+    for size in [0, 1, 2, 5, 40, 300]:
+        for _ in range(20):
+            items = [Item(key) for key in range(size)]
+            if keyed:
+                collection = mvvm.KeyedObservableCollection(list(items), key=lambda item: item.key)
+            else:
+                collection = mvvm.ObservableCollection(list(items))
+            collection.filter_remove_reset_threshold = rng.choice([0, 64, size])
+            removing = set(rng.sample(range(size), rng.randint(0, size)))
+            mirror = list(items)
+
+            def removed(start, end):
+                del mirror[start:end + 1]
+                # What the collection reads as while its observers hear about each run
+                assert len(collection) == len(mirror)
+                assert list(collection) == mirror
+                assert [collection[row] for row in range(len(mirror))] == mirror
+                if keyed:
+                    _check_index(collection)
+
+            def reset():
+                mirror[:] = collection
+
+            collection.rows_removed.connect(removed)
+            collection.model_reset.connect(reset)
+            collection.filter_remove(lambda item: item.key in removing)
+            expected = [item for item in items if item.key not in removing]
+            assert list(collection) == expected
+            assert mirror == expected
+            if keyed:
+                _check_index(collection)
+
+
+class _Mirror:
+    """A list replaying a collection's row change events, checked against the collection at each of them"""
+    def __init__(self, collection):
+        self.collection = collection
+        self.rows = list(collection)
+        self.counts = {"inserted": 0, "removed": 0, "moved": 0, "replaced": 0, "reset": 0}
+        collection.rows_inserted.connect(self.inserted)
+        collection.rows_removed.connect(self.removed)
+        collection.rows_moved.connect(self.moved)
+        collection.data_changed.connect(self.replaced)
+        collection.model_reset.connect(self.reset)
+
+    def check(self):
+        assert self.rows == list(self.collection)
+
+    def inserted(self, start, end):
+        self.rows[start:start] = self.collection[start:end + 1]
+        self.counts["inserted"] += end + 1 - start
+        self.check()
+
+    def removed(self, start, end):
+        del self.rows[start:end + 1]
+        self.counts["removed"] += end + 1 - start
+        self.check()
+
+    def moved(self, start, end, destination):
+        # destination is the row before which they go, counted before the move as with Qt
+        rows = self.rows[start:end + 1]
+        del self.rows[start:end + 1]
+        if destination > end:
+            destination -= len(rows)
+        self.rows[destination:destination] = rows
+        self.counts["moved"] += len(rows)
+        self.check()
+
+    def replaced(self, start, end, roles):
+        self.rows[start:end + 1] = self.collection[start:end + 1]
+        self.counts["replaced"] += end + 1 - start
+        self.check()
+
+    def reset(self):
+        self.rows = list(self.collection)
+        self.counts["reset"] += 1
+
+
+def _longest_increasing(values):
+    # Length of the longest strictly increasing subsequence, the naive way
+    best = []
+    for i, value in enumerate(values):
+        best.append(1 + max((best[j] for j in range(i) if values[j] < value), default=0))
+    return max(best, default=0)
+
+
+@pytest.mark.parametrize("keyed", [False, True])
+def test_reset_to_matches_its_target_with_the_fewest_row_changes(keyed):
+    rng = random.Random(6)
+    for _ in range(300):
+        items = [Item(key) for key in rng.sample(range(60), rng.randint(0, 30))]
+        if keyed:
+            collection = mvvm.KeyedObservableCollection(list(items), key=lambda item: item.key)
+        else:
+            collection = mvvm.ObservableCollection(list(items))
+        collection.filter_remove_reset_threshold = 10 ** 9  # Always diffed
+        view = collection.view(lambda item: item.key % 3 == 0)
+        mirror = _Mirror(collection)
+
+        # Some kept, in another order, some new, and some kept by key with a new object in their place
+        kept = rng.sample(items, rng.randint(0, len(items)))
+        by_key = {item.key: item for item in kept}
+        for key in rng.sample(sorted(by_key), len(by_key) // 4):
+            by_key[key] = Item(key, 1)
+        taken = {item.key for item in items}
+        new_items = list(by_key.values()) + [Item(key) for key in range(60, 60 + rng.randint(0, 10))]
+        rng.shuffle(new_items)
+        collection.reset_to(new_items, key=lambda item: item.key)
+
+        assert list(collection) == new_items
+        assert mirror.rows == new_items
+        assert list(view) == [item for item in new_items if item.key % 3 == 0]
+        if keyed:
+            _check_index(collection)
+        old_keys = [item.key for item in items]
+        new_keys = {item.key: row for row, item in enumerate(new_items)}
+        retained = [new_keys[key] for key in old_keys if key in new_keys]
+        assert mirror.counts["reset"] == 0
+        assert mirror.counts["removed"] == len(taken - set(new_keys))
+        assert mirror.counts["inserted"] == len(set(new_keys) - taken)
+        assert mirror.counts["moved"] == len(retained) - _longest_increasing(retained)
+        assert mirror.counts["replaced"] == sum(1 for item in new_items if item.key in taken
+                                                and item not in items)
+
+
+def test_reset_to_with_duplicate_keys_resets():
+    items = [Item(1), Item(2), Item(3)]
+    collection = mvvm.ObservableCollection(list(items))
+    mirror = _Mirror(collection)
+    new_items = [Item(2), Item(2), items[0]]
+    collection.reset_to(new_items, key=lambda item: item.key)
+    assert list(collection) == mirror.rows == new_items
+    assert mirror.counts["reset"] == 1
+    collection.reset_to(list(items), key=lambda item: item.key)  # Old keys not unique
+    assert list(collection) == mirror.rows == items
+    assert mirror.counts["reset"] == 2
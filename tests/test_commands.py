@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import mvvm
+
+mvvm.use("python")
+
+
+class Worker(mvvm.ViewModelBase):
+    def __init__(self):
+        super().__init__()
+        self.results = []
+
+    @mvvm.Command(int, executor="process", on_done="_done")
+    def square(n):
+        return n * n, os.getpid()
+
+    @mvvm.Command(str, executor="process", on_done="_done")
+    def shout(text):
+        return text.upper(), os.getpid()
+
+    def _done(self, result, error):
+        self.results.append(error if error is not None else result[0])
+
+
+def _wait(worker, count, timeout=30.0):
+    end = time.monotonic() + timeout
+    while len(worker.results) < count and time.monotonic() < end:
+        mvvm.process_events()
+        time.sleep(0.005)
+    return worker.results
+
+
+@pytest.mark.parametrize("method", [m for m in ("fork", "spawn") if m in multiprocessing.get_all_start_methods()])
+def test_different_process_commands_share_one_pool(method):
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(method))
+    mvvm.set_executor("process", executor)
+    try:
+        worker = Worker()
+        worker.square(7)
+        assert _wait(worker, 1) == [49]
+        worker.shout("abc")  # Submitted after the pool's worker started
+        assert _wait(worker, 2) == [49, "ABC"]
+        worker.square(3)
+        assert _wait(worker, 3) == [49, "ABC", 9]
+        assert Worker.__dict__["square"].__wrapped__.__qualname__ == "Worker.square"
+    finally:
+        executor.shutdown()
+        mvvm.set_executor("process", None)
@@ -0,0 +1,58 @@
+import time
+
+import mvvm
+
+mvvm.use("python")
+
+
+class Search(mvvm.ModelBase):
+    title = mvvm.Property(str, field="_title")
+    query = mvvm.Property(str, field="_query", debounce_ms=20)
+    position = mvvm.Property(int, field="_position", throttle_ms=20)
+
+    def __init__(self):
+        super().__init__()
+        self._title = ""
+        self._query = ""
+        self._position = 0
+
+
+def _settle(seconds=0.1):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        mvvm.process_events()
+        time.sleep(0.005)
+
+
+def test_undo_right_after_a_debounced_write_reverts_it():
+    model = Search()
+    journal = mvvm.ChangeJournal(merge_interval=None)
+    journal.track(model)
+    model.title = "notes"
+    model.query = "abc"
+    assert journal.undo()
+    assert (model.title, model.query) == ("notes", "")
+    _settle()  # The debounced notification of the write arrives
+    assert journal.can_redo
+    assert (model.title, model.query) == ("notes", "")
+    assert journal.redo()
+    assert model.query == "abc"
+    assert journal.undo() and journal.undo()
+    assert (model.title, model.query) == ("", "")
+
+
+def test_throttled_writes_are_each_recorded():
+    model = Search()
+    journal = mvvm.ChangeJournal(merge_interval=0)
+    journal.track(model)
+    for position in (1, 2, 3):
+        model.position = position
+        time.sleep(0.001)
+    _settle()
+    assert journal.undo()
+    assert model.position == 2
+    assert journal.undo()
+    assert model.position == 1
+    assert journal.undo()
+    assert model.position == 0
+    assert not journal.can_undo
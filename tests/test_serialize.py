@@ -0,0 +1,119 @@
+import io
+import math
+import random
+import uuid
+
+import pytest
+
+import mvvm
+from mvvm import _serialize
+
+mvvm.use("python")
+
+
+class Node(mvvm.ModelBase):
+    name = mvvm.Property(str, field="_name")
+    weight = mvvm.Property(float, field="_weight")
+    data = mvvm.Property(bytes, field="_data")
+    id = mvvm.Property(uuid.UUID, field="_id", constant=True)
+    extra = mvvm.Property(object, field="_extra")
+    children = mvvm.Property(mvvm.ObservableCollection, field="_children", constant=True)
+
+    def __init__(self, name):
+        super().__init__()
+        self._name = name
+        self._weight = 0.0
+        self._data = b""
+        self._id = uuid.uuid4()
+        self._extra = None
+        self._children = mvvm.ObservableCollection()
+
+
+def _random_text(rng):
+    return "".join(rng.choice("ab\"\\\n\x00é€😀") for _ in range(rng.randrange(12)))
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(11 if depth < 3 else 8)
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.randint(-2 ** 70, 2 ** 70) >> rng.randrange(70)  # Any varint length, either sign
+    if kind == 2:
+        return rng.choice([0.0, -0.0, math.inf, -math.inf, 1e-310, rng.uniform(-1e9, 1e9)])
+    if kind == 3:
+        return _random_text(rng)
+    if kind == 4:
+        return rng.randbytes(rng.randrange(300))
+    if kind == 5:
+        return uuid.UUID(int=rng.getrandbits(128))
+    if kind in (6, 7):
+        return rng.randrange(200)
+    if kind == 8:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    if kind == 9:
+        return {_random_value(rng, 3): _random_value(rng, depth + 1) for _ in range(rng.randrange(5))}
+    return _random_node(rng, depth + 1)
+
+
+def _random_node(rng, depth=0, extras=True):
+    node = Node(_random_text(rng))
+    node.weight = rng.uniform(-1, 1)
+    node.data = rng.randbytes(rng.randrange(20))
+    node.extra = _random_value(rng, depth + 1) if extras and depth < 3 else None
+    if depth < 3:
+        node.children.extend(_random_node(rng, depth + 1, extras) for _ in range(rng.randrange(4)))
+    return node
+
+
+def _plain(value):
+    # What a value holds, models and collections as tuples, for comparing with what was loaded
+    if isinstance(value, Node):
+        return ("Node", _plain(value.name), value.weight, value.data, value.id, _plain(value.extra),
+                _plain(value.children))
+    if isinstance(value, (list, tuple, mvvm.ObservableCollection)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, float):
+        return repr(value)  # -0.0 apart from 0.0
+    return type(value), value
+
+
+def test_binary_round_trips_any_value():
+    rng = random.Random(20)
+    for _ in range(300):
+        value = _random_value(rng)
+        data = mvvm.dumps(value, format="binary")
+        assert data.startswith(_serialize.BINARY_MAGIC)
+        assert _plain(mvvm.loads(data)) == _plain(value)
+
+
+def test_binary_files_load_in_small_chunks(monkeypatch):
+    monkeypatch.setattr(_serialize, "_BINARY_READ_BYTES", 1)
+    rng = random.Random(21)
+    for _ in range(50):
+        root = _random_node(rng)
+        fp = io.BytesIO()
+        mvvm.dump(root, fp, format="binary")
+        fp.seek(0)
+        assert _plain(mvvm.load(fp)) == _plain(root)
+
+
+def test_binary_truncated_anywhere_is_an_error():
+    root = _random_node(random.Random(22))
+    data = mvvm.dumps(root, format="binary")
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            mvvm.loads(data[:end])
+    with pytest.raises(ValueError):
+        mvvm.loads(data + b"\x00")
+
+
+def test_json_round_trips_models():
+    rng = random.Random(23)
+    for _ in range(50):
+        # JSON only tells bytes and UUIDs apart from strings where a property declares them
+        root = _random_node(rng, extras=False)
+        loaded = mvvm.loads(mvvm.dumps(root))
+        assert _plain(loaded) == _plain(root)
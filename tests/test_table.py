@@ -0,0 +1,36 @@
+import random
+
+import mvvm
+from mvvm import _common
+
+mvvm.use("python")
+
+
+def _cells(rects):
+    return [(row, column) for top, left, bottom, right in rects
+            for row in range(top, bottom + 1) for column in range(left, right + 1)]
+
+
+def test_coalesced_rects_cover_exactly_the_cells_changed():
+    rng = random.Random(25)
+    for _ in range(500):
+        rects = []
+        for _ in range(rng.randint(1, 12)):
+            top, left = rng.randrange(20), rng.randrange(8)
+            rects.append((top, left, top + rng.randrange(6), left + rng.randrange(4)))
+        coalesced = _common._coalesce_rects(rects)
+        cells = _cells(coalesced)
+        assert len(cells) == len(set(cells))  # Apart
+        assert set(cells) == set(_cells(rects))
+        assert all(top <= bottom and left <= right for top, left, bottom, right in coalesced)
+
+
+def test_cell_changes_are_notified_once_merged():
+    table = mvvm.ObservableTable([[0] * 4 for _ in range(10)])
+    changed = []
+    table.data_changed.connect(lambda *cells: changed.append(cells))
+    table.update_cells((row, column, 1) for row in range(2, 6) for column in range(1, 3))
+    table.set_cell(9, 3, 2)
+    assert not changed
+    table.flush_changes()
+    assert sorted(changed) == [(2, 1, 5, 2), (9, 3, 9, 3)]
@@ -0,0 +1,48 @@
+import itertools
+import math
+import random
+import types
+
+import mvvm
+from mvvm import _common
+
+mvvm.use("python")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_callbacks_run_at_the_first_step_after_their_deadline(monkeypatch):
+    # Quarter second steps on a one second resolution, all exact in binary floating point
+    clock = _Clock()
+    monkeypatch.setattr(_common, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    ticking = []
+    wheel = _common.TimerWheel(1.0, ticking.append, slots=8)
+    rng = random.Random(20)
+    numbers = itertools.count()
+    pending = {}  # Callback number -> deadline
+    fired = []
+
+    for _ in range(2000):
+        for _ in range(rng.choice([0, 0, 1, 3])):
+            # Up to several laps of the wheel ahead
+            n = next(numbers)
+            pending[n] = deadline = clock.now + rng.randint(1, 100) / 4
+            wheel.call_later(deadline - clock.now, lambda n=n: fired.append(n))
+        # Mostly short steps, now and then a stall of several laps
+        clock.now += rng.randint(1, 4) / 4 if rng.random() < 0.97 else rng.randint(8, 40)
+        fired.clear()
+        wheel.step()
+        due = sorted(n for n, deadline in pending.items() if clock.now >= math.ceil(deadline))
+        assert sorted(fired) == due
+        for n in due:
+            del pending[n]
+        assert len(wheel) == len(pending)
+        assert bool(ticking and ticking[-1]) == bool(pending)
+
+    assert all(a != b for a, b in zip(ticking, ticking[1:]))